@@ -7,11 +7,14 @@ import re
 
 # Importar funciones de los módulos especializados
 from extractores_patrones import (
-    PATRONES_CONCEPTO,
-    PATRONES_PARAMETROS_ESPECIFICOS
+    PATRONES_CONCEPTO_COMBINADOS,
+    PATRONES_PARAMETROS_ESPECIFICOS,
+    PREFILTROS_PARAMETROS,
+    escanear_conceptos
 )
 from extractores_pdf import (
     convertir_pdf_a_csv,
+    convertir_pdf_a_csv_batch,
     procesar_texto,
     extraer_datos_estructurados,
     analizar_estructura_columnas
@@ -39,6 +42,10 @@ def extraer_valores_hes(content):
         'hes6': "0", 'hes7': "0", 'hes8': "0", 'hes9': "0", 'hes10': "0"
     }
     
+    # Si el contenido no menciona HES, no hay nada que buscar
+    if 'HES' not in content:
+        return results
+
     # Patrones para cada HES (1-10)
     for i in range(1, 11):
         # Crear varios patrones para cada HES
@@ -86,13 +93,16 @@ def extraer_parametros_especificos(content):
 
     # LÓGICA ESPECIAL PARA IR - Verificar primero si está vacío
     # Buscar el patrón "IR:,Grupo:" que indica que IR está vacío
-    if re.search(r'IR:\s*,\s*Grupo:', content):
+    if PREFILTROS_PARAMETROS['ir'] not in content:
+        # Sin etiqueta IR en el contenido: mantener el valor por defecto
+        pass
+    elif re.search(r'IR:\s*,\s*Grupo:', content):
         # IR está vacío, mantener el valor por defecto "0"
         parametros['ir'] = "0"
     else:
         # IR no está vacío, intentar extraer su valor
         for patron in PATRONES_PARAMETROS_ESPECIFICOS['ir'][1:]:  # Omitir el primer patrón de detección
-            match = re.search(patron, content)
+            match = patron.search(content)
             if match:
                 value = match.group(1)
                 # Limpiar el valor para asegurarse de que sea numérico
@@ -102,28 +112,33 @@ def extraer_parametros_especificos(content):
                     break
 
     # Patrones combinados para DIU/DIUM y FIU/FIUM
-    match_diu = re.search(PATRONES_PARAMETROS_ESPECIFICOS['diu_dium_int'][0], content)
-    if match_diu:
-        parametros['diu_int'] = match_diu.group(1)
-        parametros['dium_int'] = match_diu.group(2)
+    if PREFILTROS_PARAMETROS['diu_dium_int'] in content:
+        match_diu = PATRONES_PARAMETROS_ESPECIFICOS['diu_dium_int'][0].search(content)
+        if match_diu:
+            parametros['diu_int'] = match_diu.group(1)
+            parametros['dium_int'] = match_diu.group(2)
 
-    match_fiu = re.search(PATRONES_PARAMETROS_ESPECIFICOS['fiu_fium_int'][0], content)
-    if match_fiu:
-        parametros['fiu_int'] = match_fiu.group(1)
-        parametros['fium_int'] = match_fiu.group(2)
+    if PREFILTROS_PARAMETROS['fiu_fium_int'] in content:
+        match_fiu = PATRONES_PARAMETROS_ESPECIFICOS['fiu_fium_int'][0].search(content)
+        if match_fiu:
+            parametros['fiu_int'] = match_fiu.group(1)
+            parametros['fium_int'] = match_fiu.group(2)
 
     # Patrones individuales para los que no se encontraron en pareja (excepto IR que ya fue procesado)
     for key in ['grupo', 'diu_int', 'dium_int', 'fiu_int', 'fium_int', 'fiug', 'diug']:
         if parametros[key] == "0": # Solo buscar si no se ha encontrado ya
+            # Saltar el parámetro si su etiqueta literal no aparece
+            if PREFILTROS_PARAMETROS[key] not in content:
+                continue
             for patron in PATRONES_PARAMETROS_ESPECIFICOS[key]:
-                match = re.search(patron, content)
+                match = patron.search(content)
                 if match:
                     # Para patrones combinados como fiug_diug, puede haber más de un grupo
-                    if key == 'fiug' and 'DIUG' in patron:
+                    if key == 'fiug' and 'DIUG' in patron.pattern:
                         parametros['fiug'] = match.group(1)
                         parametros['diug'] = match.group(2)
                         break # Salir del bucle de patrones para esta clave
-                    elif key == 'diug' and 'FIUG' in patron:
+                    elif key == 'diug' and 'FIUG' in patron.pattern:
                         parametros['fiug'] = match.group(1)
                         parametros['diug'] = match.group(2)
                         break # Salir del bucle de patrones para esta clave
@@ -198,36 +213,27 @@ def extraer_datos_factura(file_path):
         "numero_factura": numero_factura,
     }
     
-    # Extract all the financial variables
-    for var_name, patterns in PATRONES_CONCEPTO.items():
+    # Extract all the financial variables en una sola pasada sobre el contenido
+    valores_conceptos = escanear_conceptos(content)
+
+    for var_name in PATRONES_CONCEPTO_COMBINADOS:
         # Skip subtotal_energia_contribucion_pesos since it will be calculated later
         if var_name == "subtotal_energia_contribucion_pesos":
             continue
-        
-        value = "No encontrado"
-        for pattern in patterns:
-            match = re.search(pattern, content)
-            if match:
-                # Clean the captured value
-                captured_value = match.group(1)
-                # Remove commas at the beginning of the value
-                if captured_value.startswith(','):
-                    captured_value = captured_value[1:]
-                value = captured_value
-                break
+
+        value = valores_conceptos.get(var_name, "No encontrado")
+        # Remove commas at the beginning of the value
+        if value.startswith(','):
+            value = value[1:]
         results[var_name] = value
-    
-    # Intentar extraer subtotal_energia_contribucion_pesos directamente usando patrones
-    for pattern in PATRONES_CONCEPTO['subtotal_energia_contribucion_pesos']:
-        match = re.search(pattern, content)
-        if match:
-            # Clean the captured value
-            captured_value = match.group(1)
-            # Remove commas at the beginning of the value
-            if captured_value.startswith(','):
-                captured_value = captured_value[1:]
-            results["subtotal_energia_contribucion_pesos"] = captured_value
-            break
+
+    # Intentar extraer subtotal_energia_contribucion_pesos directamente del escaneo
+    captured_value = valores_conceptos.get("subtotal_energia_contribucion_pesos")
+    if captured_value is not None:
+        # Remove commas at the beginning of the value
+        if captured_value.startswith(','):
+            captured_value = captured_value[1:]
+        results["subtotal_energia_contribucion_pesos"] = captured_value
     
     # Si no se encontró, calcular subtotal_energia_contribucion_pesos como la suma de subtotal_base_energia y contribucion
     if "subtotal_energia_contribucion_pesos" not in results or results["subtotal_energia_contribucion_pesos"] == "No encontrado":
@@ -311,6 +317,7 @@ def extraer_todos_datos_factura(file_path):
 # para mantener compatibilidad con el resto del código
 __all__ = [
     'convertir_pdf_a_csv',
+    'convertir_pdf_a_csv_batch',
     'procesar_texto',
     'extraer_datos_estructurados',
     'analizar_estructura_columnas',
@@ -3,8 +3,11 @@ Módulo para extraer la tabla de componentes de energía de las facturas.
 Soporta tanto el formato viejo como el nuevo de las facturas.
 """
 
+import csv
 import re
-from extractores_patrones import COMPONENTES_ENERGIA
+from concurrent.futures import ProcessPoolExecutor
+from extractores_patrones import (COMPONENTES_ENERGIA, COMPONENTES_POR_NUMERO,
+                                  PATRON_FILA_COMPONENTE, PATRONES_CONCEPTO_COMBINADOS)
 
 
 def leer_archivo(file_path):
@@ -17,85 +20,153 @@ def leer_archivo(file_path):
     Returns:
         str: Contenido del archivo
     """
+    # Leer en binario una sola vez y decodificar en memoria: así el
+    # fallback de codificación no vuelve a leer el archivo del disco
+    with open(file_path, 'rb') as file:
+        data = file.read()
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            content = file.read()
+        content = data.decode('utf-8')
     except UnicodeDecodeError:
         # Intentar con otra codificación
-        with open(file_path, 'r', encoding='latin-1') as file:
-            content = file.read()
-    return content
+        content = data.decode('latin-1')
+    return normalizar_mojibake(content)
+
+
+# Indicadores de cada formato combinados en una sola alternativa: el motor
+# de re recorre el texto una vez por grupo de indicadores en lugar de una
+# vez por indicador
+_RE_INDICADORES_NUEVO = re.compile(
+    r'Tarifa\s*\$\/kWh|Ajustes\s+meses\s+anteriores|"Ajustes\s+meses"\s+"anteriores\s+\$"',
+    re.IGNORECASE
+)
+_RE_INDICADORES_VIEJO = re.compile(
+    r'kWh\s+-\s+kVArh|Mes\s+anteriores\s+\$',
+    re.IGNORECASE
+)
 
 
 def detectar_formato_tabla(content):
     """
     Detecta si la tabla de componentes está en formato nuevo o viejo.
-    
+
     Args:
         content (str): Contenido del archivo CSV
-    
+
     Returns:
         bool: True si es formato nuevo, False si es formato viejo
     """
-    # Indicadores del formato nuevo
-    indicadores_nuevo = [
-        r'Tarifa\s*\$\/kWh',
-        r'Ajustes\s+meses\s+anteriores',
-        r'"Tarifa\s+\$\/kWh"',
-        r'"Ajustes\s+meses"\s+"anteriores\s+\$"',
-        r'EnergÃ­a\s+activa'  # Nuevo indicador para el formato con codificación alterada
-    ]
-    
-    # Indicadores del formato viejo
-    indicadores_viejo = [
-        r'kWh\s+-\s+kVArh',
-        r'Mes\s+anteriores\s+\$',
-        r'kWh\s+-\s+kVArh,\$\/kWh'
-    ]
-    
-    # Verificar indicadores del formato nuevo
-    for indicador in indicadores_nuevo:
-        if re.search(indicador, content, re.IGNORECASE):
+    def buscar_indicadores(texto):
+        # Verificar indicadores del formato nuevo
+        if _RE_INDICADORES_NUEVO.search(texto):
             return True
-    
-    # Verificar indicadores del formato viejo
-    for indicador in indicadores_viejo:
-        if re.search(indicador, content, re.IGNORECASE):
+
+        # Verificar indicadores del formato viejo
+        if _RE_INDICADORES_VIEJO.search(texto):
             return False
-    
+
+        return None
+
+    # Los indicadores aparecen en el encabezado de la tabla, así que basta
+    # con revisar los primeros KB; solo si no es concluyente se revisa todo
+    resultado = buscar_indicadores(content[:8192])
+    if resultado is None and len(content) > 8192:
+        resultado = buscar_indicadores(content)
+
     # Por defecto, asumir formato nuevo
-    return True
+    return resultado if resultado is not None else True
+
+
+# Tabla para eliminar comillas y comas de miles en una sola pasada
+_TABLA_LIMPIEZA_VALOR = str.maketrans('', '', '",')
+
+# Secuencias UTF-8 leídas como latin-1 ("EnergÃ­a") -> carácter correcto
+_REEMPLAZOS_MOJIBAKE = (
+    ('Ã¡', 'á'),
+    ('Ã©', 'é'),
+    ('Ã­', 'í'),
+    ('Ã³', 'ó'),
+    ('Ãº', 'ú'),
+    ('Ã±', 'ñ'),
+)
+
+
+def normalizar_mojibake(content):
+    """
+    Corrige la codificación alterada del contenido una sola vez.
+
+    Algunas facturas llegan con los acentos rotos (UTF-8 interpretado como
+    latin-1). Normalizarlos al leer el archivo evita duplicar cada patrón
+    de etiqueta con su variante alterada.
+
+    Args:
+        content (str): Contenido del archivo
+
+    Returns:
+        str: Contenido con los acentos corregidos
+    """
+    if 'Ã' not in content:
+        return content
+    for secuencia, caracter in _REEMPLAZOS_MOJIBAKE:
+        content = content.replace(secuencia, caracter)
+    return content
+
+# Un bit por componente para llevar el registro de encontrados sin sets
+_BITS_COMPONENTES = {
+    component["name"]: 1 << indice
+    for indice, component in enumerate(COMPONENTES_ENERGIA)
+}
+_MASCARA_COMPLETA = (1 << len(COMPONENTES_ENERGIA)) - 1
+
+# Número de componente al inicio de la línea ("1.", "2.", ...)
+_RE_PREFIJO_COMPONENTE = re.compile(r'\s*"?(\d+)\.')
+
+# Forma que debe tener una columna de valores bien tokenizada: dígitos con
+# separadores de miles/decimales y signo opcional, o vacía/'-' (cero).
+# Una comilla u otro carácter suelto delata una fila con comillas
+# desbalanceadas que csv.reader tokenizó mal en lugar de rechazar
+_RE_VALOR_COLUMNA = re.compile(r'-?[\d.,]*')
+
+# Mapa número de componente -> (nombre, keywords en minúsculas)
+# El contenido ya pasó por normalizar_mojibake, así que basta con las
+# variantes con y sin acento
+_COMPONENTES_POR_PREFIJO = {
+    '1': ('Generación', ['generación', 'generacion']),
+    '2': ('Comercialización', ['comercialización', 'comercializacion']),
+    '3': ('Transmisión', ['transmisión', 'transmision']),
+    '4': ('Distribución', ['distribución', 'distribucion']),
+    '5': ('Pérdidas', ['perdidas', 'pérdidas']),
+    '6': ('Restricciones', ['restricciones', 'restricción']),
+    '7': ('Otros cargos', ['otros', 'otro']),
+    '8': ('Energía inductiva + capacitiva', ['inductiva', 'capacitiva', 'energía'])
+}
 
 
 def limpiar_valor(valor, es_decimal=False):
     """
     Limpia un valor eliminando caracteres innecesarios.
-    
+
     Args:
         valor (str): Valor a limpiar
         es_decimal (bool): Si el valor debe mantener decimales
-        
+
     Returns:
         str: Valor limpio
     """
     if not valor:
         return "0"
-    
-    # Eliminar comillas y espacios
+
+    # Eliminar comillas, comas de miles y espacios en una sola pasada
     if isinstance(valor, str):
-        valor = valor.replace('"', '').strip()
-        
+        valor = valor.translate(_TABLA_LIMPIEZA_VALOR).strip()
+
         # Si está vacío después de limpiar
         if not valor or valor == '-':
             return "0"
-        
+
         # Para valores con .0 al final (formato nuevo)
         if not es_decimal and valor.endswith('.0'):
             valor = valor[:-2]
-        
-        # Eliminar comas de miles
-        valor = valor.replace(',', '')
-    
+
     return valor
 
 
@@ -109,159 +180,90 @@ def extraer_energia_valores(content):
     Returns:
         tuple: (energia_activa, energia_reactiva_total)
     """
-    # Buscar valor de energía activa
-    energia_activa_patterns = [
-        r'Energ[ií]a\s+activa[,\s]+"?([0-9.,]+)"?', 
-        r'EnergÃ­a\s+activa[,\s]+"?([0-9.,]+)"?', 
-        r'"EnergÃ­a\tactiva,""([0-9.,]+)"""',
-        r'EnergÃ­a\tactiva,([0-9.,]+)'
-    ]
-    
+    # Buscar valor de energía activa con el patrón combinado centralizado
     energia_activa = "0"
-    for pattern in energia_activa_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            energia_activa = match.group(1)
-            break
-    
+    match = PATRONES_CONCEPTO_COMBINADOS['energia_activa'].search(content)
+    if match:
+        energia_activa = match.group(match.lastindex)
+
     # Buscar valor de energía reactiva total
-    energia_reactiva_patterns = [
-        r'Total\s+energ[ií]a\s+reactiva[,\s]+"?([0-9.,]+)"?',
-        r'Total\s+energÃ­a\s+reactiva[,\s]+"?([0-9.,]+)"?',
-        r'"Total\tenergÃ­a\treactiva,([0-9.,]+)"',
-        r'Total\tenergÃ­a\treactiva,([0-9.,]+)'
-    ]
-    
     energia_reactiva_total = "0"
-    for pattern in energia_reactiva_patterns:
-        match = re.search(pattern, content, re.IGNORECASE)
-        if match:
-            energia_reactiva_total = match.group(1)
-            break
-    
+    match = PATRONES_CONCEPTO_COMBINADOS['total_energia_reactiva'].search(content)
+    if match:
+        energia_reactiva_total = match.group(match.lastindex)
+
     return limpiar_valor(energia_activa), limpiar_valor(energia_reactiva_total)
 
 
-def procesar_componente_generacion(match, es_formato_nuevo, energia_activa=None):
+def procesar_componente(grupos, component, es_formato_nuevo, valor_energia=None):
     """
-    Procesa específicamente el componente de Generación.
-    
+    Procesa un componente a partir de sus columnas capturadas.
+
+    La estructura de las columnas se decide con la bandera "has_kwh" del
+    componente y la cantidad de columnas capturadas, de modo que un solo
+    procesador cubre tanto los componentes estándar como Generación y
+    Energía inductiva + capacitiva.
+
     Args:
-        match: Objeto match de regex
+        grupos (tuple): Columnas capturadas de la fila del componente
+                        (con la columna de kWh al inicio si existe)
+        component (dict): Entrada de COMPONENTES_ENERGIA para el componente
         es_formato_nuevo (bool): Si es formato nuevo o viejo
-        energia_activa (str, optional): Valor de energía activa extraído previamente
-        
+        valor_energia (str, optional): Valor de energía (activa o reactiva total)
+                                       extraído previamente del contenido
+
     Returns:
         dict: Diccionario con los datos del componente
     """
-    concepto = {"concepto": "Generación"}
-    
-    # Usar el valor de energía activa extraído si está disponible
-    if energia_activa is not None:
-        concepto["kwh_kvarh"] = energia_activa
-    elif es_formato_nuevo and len(match.groups()) == 4:
-        # Formato nuevo sin kWh
-        concepto["kwh_kvarh"] = "N/A"
-    elif len(match.groups()) >= 5:
-        # Formato viejo con kWh
-        concepto["kwh_kvarh"] = limpiar_valor(match.group(1))
-    else:
-        # Formato ambiguo, intentar detectar
+    concepto = {"concepto": component["name"]}
+    num_grupos = len(grupos)
+
+    if not component.get("has_kwh"):
+        # Componentes estándar: sin columna de kWh
         concepto["kwh_kvarh"] = "N/A"
-    
-    # Procesar resto de campos
-    if es_formato_nuevo and len(match.groups()) == 4:
-        concepto["precio_kwh"] = limpiar_valor(match.group(1), es_decimal=True)
-        concepto["mes_corriente"] = limpiar_valor(match.group(2))
-        concepto["mes_anteriores"] = limpiar_valor(match.group(3))
-        concepto["total"] = limpiar_valor(match.group(4))
-    elif len(match.groups()) >= 5:
-        concepto["precio_kwh"] = limpiar_valor(match.group(2), es_decimal=True)
-        concepto["mes_corriente"] = limpiar_valor(match.group(3))
-        concepto["mes_anteriores"] = limpiar_valor(match.group(4))
-        concepto["total"] = limpiar_valor(match.group(5))
-    else:
-        concepto["precio_kwh"] = limpiar_valor(match.group(1), es_decimal=True)
-        concepto["mes_corriente"] = limpiar_valor(match.group(2))
-        concepto["mes_anteriores"] = limpiar_valor(match.group(3))
-        concepto["total"] = limpiar_valor(match.group(4) if len(match.groups()) > 3 else "0")
-    
-    return concepto
+        concepto["precio_kwh"] = limpiar_valor(grupos[0], es_decimal=True)
+        concepto["mes_corriente"] = limpiar_valor(grupos[1])
+        concepto["mes_anteriores"] = limpiar_valor(grupos[2])
+        concepto["total"] = limpiar_valor(grupos[3])
 
+        # Manejar valores negativos correctamente
+        if concepto["mes_anteriores"].startswith('-'):
+            concepto["mes_anteriores"] = "-" + concepto["mes_anteriores"][1:].replace('-', '')
+        if concepto["total"].startswith('-'):
+            concepto["total"] = "-" + concepto["total"][1:].replace('-', '')
 
-def procesar_componente_energia_inductiva(match, es_formato_nuevo, energia_reactiva_total=None):
-    """
-    Procesa específicamente el componente de Energía inductiva + capacitiva.
-    
-    Args:
-        match: Objeto match de regex
-        es_formato_nuevo (bool): Si es formato nuevo o viejo
-        energia_reactiva_total (str, optional): Valor de energía reactiva total extraído previamente
-        
-    Returns:
-        dict: Diccionario con los datos del componente
-    """
-    concepto = {"concepto": "Energía inductiva + capacitiva"}
-    
-    # Usar el valor de energía reactiva total extraído si está disponible
-    if energia_reactiva_total is not None:
-        concepto["kwh_kvarh"] = energia_reactiva_total
-    elif es_formato_nuevo and len(match.groups()) == 4:
+        return concepto
+
+    # Componentes con kWh: usar el valor de energía extraído si está disponible
+    if valor_energia is not None:
+        concepto["kwh_kvarh"] = valor_energia
+    elif es_formato_nuevo and num_grupos == 4:
         # Formato nuevo sin kWh
         concepto["kwh_kvarh"] = "N/A"
-    elif len(match.groups()) >= 5:
+    elif num_grupos >= 5:
         # Formato viejo con kWh
-        concepto["kwh_kvarh"] = limpiar_valor(match.group(1))
+        concepto["kwh_kvarh"] = limpiar_valor(grupos[0])
     else:
         # Formato ambiguo
         concepto["kwh_kvarh"] = "N/A"
-    
-    # Procesar resto de campos
-    if es_formato_nuevo and len(match.groups()) == 4:
-        concepto["precio_kwh"] = limpiar_valor(match.group(1), es_decimal=True)
-        concepto["mes_corriente"] = limpiar_valor(match.group(2))
-        concepto["mes_anteriores"] = limpiar_valor(match.group(3))
-        concepto["total"] = limpiar_valor(match.group(4))
-    elif len(match.groups()) >= 5:
-        concepto["precio_kwh"] = limpiar_valor(match.group(2), es_decimal=True)
-        concepto["mes_corriente"] = limpiar_valor(match.group(3))
-        concepto["mes_anteriores"] = limpiar_valor(match.group(4))
-        concepto["total"] = limpiar_valor(match.group(5))
+
+    # Determinar en qué columna empiezan los campos monetarios
+    if es_formato_nuevo and num_grupos == 4:
+        inicio = 0
+    elif num_grupos >= 5:
+        inicio = 1
     else:
-        concepto["precio_kwh"] = limpiar_valor(match.group(1), es_decimal=True)
-        concepto["mes_corriente"] = limpiar_valor(match.group(2))
-        concepto["mes_anteriores"] = limpiar_valor(match.group(3))
-        concepto["total"] = limpiar_valor(match.group(4) if len(match.groups()) > 3 else "0")
-    
-    return concepto
+        # Formato ambiguo: misma estructura que el nuevo
+        inicio = 0
 
+    concepto["precio_kwh"] = limpiar_valor(grupos[inicio], es_decimal=True)
+    concepto["mes_corriente"] = limpiar_valor(grupos[inicio + 1])
+    concepto["mes_anteriores"] = limpiar_valor(grupos[inicio + 2])
+    if num_grupos > inicio + 3:
+        concepto["total"] = limpiar_valor(grupos[inicio + 3])
+    else:
+        concepto["total"] = "0"
 
-def procesar_componente_standard(match, nombre_componente):
-    """
-    Procesa componentes estándar (sin kWh).
-    
-    Args:
-        match: Objeto match de regex
-        nombre_componente (str): Nombre del componente
-        
-    Returns:
-        dict: Diccionario con los datos del componente
-    """
-    concepto = {
-        "concepto": nombre_componente,
-        "kwh_kvarh": "N/A",
-        "precio_kwh": limpiar_valor(match.group(1), es_decimal=True),
-        "mes_corriente": limpiar_valor(match.group(2)),
-        "mes_anteriores": limpiar_valor(match.group(3)),
-        "total": limpiar_valor(match.group(4))
-    }
-    
-    # Manejar valores negativos correctamente
-    if concepto["mes_anteriores"].startswith('-'):
-        concepto["mes_anteriores"] = "-" + concepto["mes_anteriores"][1:].replace('-', '')
-    if concepto["total"].startswith('-'):
-        concepto["total"] = "-" + concepto["total"][1:].replace('-', '')
-    
     return concepto
 
 
@@ -285,56 +287,93 @@ def extraer_tabla_componentes(file_path):
     energia_activa, energia_reactiva_total = extraer_energia_valores(content)
     
     concepto_data = []
-    componentes_encontrados = set()
-    
-    # Extraer cada componente usando los patrones definidos
-    for component in COMPONENTES_ENERGIA:
-        nombre = component["name"]
-        
-        # Si ya encontramos este componente, saltar
-        if nombre in componentes_encontrados:
-            continue
-        
-        # Probar cada patrón del componente
-        for pattern in component.get("patterns", []):
-            match = re.search(pattern, content)
-            
-            if match:
-                concepto = None
-                
-                # Procesar según el tipo de componente
-                if nombre == "Generación":
-                    concepto = procesar_componente_generacion(match, es_formato_nuevo, energia_activa)
-                elif nombre == "Energía inductiva + capacitiva":
-                    concepto = procesar_componente_energia_inductiva(match, es_formato_nuevo, energia_reactiva_total)
-                else:
-                    concepto = procesar_componente_standard(match, nombre)
-                
-                if concepto:
-                    concepto_data.append(concepto)
-                    componentes_encontrados.add(nombre)
-                    break  # Salir del loop de patrones si encontramos uno
-    
-    # Si faltan componentes, intentar extracción línea por línea
-    if len(concepto_data) < 8:
-        extraer_componentes_linea_por_linea(content, concepto_data, componentes_encontrados, es_formato_nuevo, 
-                                           energia_activa, energia_reactiva_total)
-    
+
+    # Primero la pasada línea por línea: la tabla de componentes es CSV
+    # bien formado ("1. Generación,..."), así que el tokenizador en C del
+    # módulo csv resuelve la mayoría de los casos en una sola pasada
+    mascara_encontrados = extraer_componentes_linea_por_linea(
+        content, concepto_data, 0, es_formato_nuevo,
+        energia_activa, energia_reactiva_total)
+
+    # La regex estructural queda como respaldo para los componentes que la
+    # pasada por líneas no pudo identificar (p. ej. filas con comillas
+    # desbalanceadas que el módulo csv no tokeniza): una sola búsqueda
+    # cubre las ocho filas numeradas, despachando por el número capturado
+    if mascara_encontrados != _MASCARA_COMPLETA:
+        for match in PATRON_FILA_COMPONENTE.finditer(content):
+            component = COMPONENTES_POR_NUMERO.get(int(match.group(1)))
+            if component is None:
+                continue
+
+            nombre = component["name"]
+
+            # Si ya encontramos este componente, saltar
+            if mascara_encontrados & _BITS_COMPONENTES[nombre]:
+                continue
+
+            # Confirmar que la etiqueta corresponde al número de la fila
+            if identificar_componente(match.group(0)) != nombre:
+                continue
+
+            # Elegir el valor de energía pre-extraído según el componente
+            if nombre == "Generación":
+                valor_energia = energia_activa
+            elif nombre == "Energía inductiva + capacitiva":
+                valor_energia = energia_reactiva_total
+            else:
+                valor_energia = None
+
+            # Descartar la columna opcional de kWh cuando la fila no la trae
+            grupos = match.groups()[2:] if match.group(3) is not None else match.groups()[3:]
+            concepto = procesar_componente(grupos, component, es_formato_nuevo, valor_energia)
+
+            if concepto:
+                concepto_data.append(concepto)
+                mascara_encontrados |= _BITS_COMPONENTES[nombre]
+
+            # Si ya están todos los componentes, no hay nada más que buscar
+            if mascara_encontrados == _MASCARA_COMPLETA:
+                break
+
     return concepto_data
 
 
-def extraer_componentes_linea_por_linea(content, concepto_data, componentes_encontrados, es_formato_nuevo, 
+def extraer_tabla_componentes_batch(file_paths, workers=None):
+    """
+    Extrae la tabla de componentes de varias facturas en paralelo.
+
+    Cada archivo es independiente, por lo que el trabajo se reparte entre
+    procesos para aprovechar todos los núcleos disponibles.
+
+    Args:
+        file_paths (list): Rutas a los archivos CSV de las facturas
+        workers (int, optional): Número de procesos a usar.
+                                 Si es None, se usa el número de CPUs.
+
+    Returns:
+        list: Lista con el resultado de extraer_tabla_componentes por archivo,
+              en el mismo orden que file_paths
+    """
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(extraer_tabla_componentes, file_paths, chunksize=8))
+
+
+def extraer_componentes_linea_por_linea(content, concepto_data, mascara_encontrados, es_formato_nuevo,
                                        energia_activa=None, energia_reactiva_total=None):
     """
     Extrae componentes procesando el contenido línea por línea.
-    
+
     Args:
         content (str): Contenido del archivo
         concepto_data (list): Lista de conceptos ya encontrados
-        componentes_encontrados (set): Set de nombres de componentes ya encontrados
+        mascara_encontrados (int): Máscara de bits de componentes ya encontrados
+                                   (un bit por entrada de COMPONENTES_ENERGIA)
         es_formato_nuevo (bool): Si es formato nuevo o viejo
         energia_activa (str, optional): Valor de energía activa extraído previamente
         energia_reactiva_total (str, optional): Valor de energía reactiva total extraído previamente
+
+    Returns:
+        int: Máscara de bits actualizada con los componentes encontrados
     """
     lines = content.split('\n')
     
@@ -343,33 +382,31 @@ def extraer_componentes_linea_por_linea(content, concepto_data, componentes_enco
         if not re.match(r'^\d+\.', line):
             continue
         
-        # Parsear la línea respetando las comillas
-        parts = []
-        in_quotes = False
-        current_part = ""
-        
-        for char in line:
-            if char == '"':
-                in_quotes = not in_quotes
-            elif char == ',' and not in_quotes:
-                parts.append(current_part.strip())
-                current_part = ""
-            else:
-                current_part += char
-        
-        if current_part:
-            parts.append(current_part.strip())
+        # Parsear la línea respetando las comillas; el módulo csv hace la
+        # tokenización en C, mucho más rápido que un loop por carácter
+        try:
+            parts = [part.strip() for part in next(csv.reader([line]))]
+        except (csv.Error, StopIteration):
+            continue
         
         # Identificar el componente
         component_name = identificar_componente(parts[0] if parts else "")
         
         # Si identificamos el componente y no lo tenemos ya
-        if component_name and component_name not in componentes_encontrados:
-            concepto = procesar_linea_componente(parts, component_name, es_formato_nuevo, 
+        if component_name and not mascara_encontrados & _BITS_COMPONENTES[component_name]:
+            # csv.reader no rechaza las filas con comillas desbalanceadas:
+            # las tokeniza mal, corriendo o fusionando columnas. Si alguna
+            # columna de valores no tiene forma numérica, no marcar el
+            # componente para que la regex estructural de respaldo la reintente
+            if not all(_RE_VALOR_COLUMNA.fullmatch(parte) for parte in parts[1:]):
+                continue
+            concepto = procesar_linea_componente(parts, component_name, es_formato_nuevo,
                                                energia_activa, energia_reactiva_total)
             if concepto:
                 concepto_data.append(concepto)
-                componentes_encontrados.add(component_name)
+                mascara_encontrados |= _BITS_COMPONENTES[component_name]
+
+    return mascara_encontrados
 
 
 def identificar_componente(texto):
@@ -382,23 +419,22 @@ def identificar_componente(texto):
     Returns:
         str: Nombre del componente o None
     """
-    componentes_map = {
-        '1.': ('Generación', ['Generación', 'Generacion', 'GeneraciÃ³n']),
-        '2.': ('Comercialización', ['Comercialización', 'Comercializacion', 'ComercializaciÃ³n']),
-        '3.': ('Transmisión', ['Transmisión', 'Transmision', 'TransmisiÃ³n']),
-        '4.': ('Distribución', ['Distribución', 'Distribucion', 'DistribuciÃ³n']),
-        '5.': ('Pérdidas', ['Perdidas', 'Pérdidas', 'PÃ©rdidas']),
-        '6.': ('Restricciones', ['Restricciones', 'RestricciÃ³n']),
-        '7.': ('Otros cargos', ['Otros', 'Otro']),
-        '8.': ('Energía inductiva + capacitiva', ['inductiva', 'capacitiva', 'EnergÃ­a'])
-    }
-    
-    for prefix, (nombre, keywords) in componentes_map.items():
-        if prefix in texto:
-            for keyword in keywords:
-                if keyword.lower() in texto.lower():
-                    return nombre
-    
+    match = _RE_PREFIJO_COMPONENTE.match(texto)
+    if not match:
+        return None
+
+    # Lookup directo por el número del componente en vez de recorrer
+    # todos los prefijos buscando subcadenas
+    entrada = _COMPONENTES_POR_PREFIJO.get(match.group(1))
+    if not entrada:
+        return None
+
+    nombre, keywords = entrada
+    texto_lower = texto.lower()
+    for keyword in keywords:
+        if keyword in texto_lower:
+            return nombre
+
     return None
 
 
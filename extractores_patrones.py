@@ -1,416 +1,454 @@
-"""
-Módulo con todos los patrones regex para extracción de datos de facturas.
-Este módulo centraliza todos los patrones de expresiones regulares utilizados
-para extraer información de las facturas de energía.
-"""
-
-# Patrones regex centralizados para extracción de datos generales
-PATRONES_CONCEPTO = {
-    'subtotal_base_energia': [
-        # Nuevos patrones para manejar formato con .0 al final
-        r'Subtotal\s+base\s+energÃ­a[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\tbase\tenergÃ­a[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\s+base\s+energía[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\tbase\tenergía[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        # Patrones adicionales para capturar el valor completo
-        r'Subtotal\s+base\s+energÃ­a[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Subtotal\tbase\tenergÃ­a[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos mantenidos por compatibilidad
-        r'Subtotal base energía.*?"([-\d,]+)"',
-        r'Subtotal\tbase\tenergía.*?"([-\d,]+)"',
-        r'Subtotal base energía.*?(?<!")(\d+)(?!")',
-        r'Subtotal\tbase\tenergía.*?(?<!")(\d+)(?!")'
-    ],
-    'contribucion': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'ContribuciÃ³n[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Contribución[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'ContribuciÃ³n[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Contribución[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos mantenidos por compatibilidad
-        r'Contribución.*?"([-\d,]+)"',
-        r'Contribución.*?(?<!")(\d+)(?!")'
-    ],
-    'contribucion_otros_meses': [
-        r'ContribuciÃ³n\s+de\s+otros\s+meses[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Contribución\s+de\s+otros\s+meses[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Contribución de otros meses.*?([-\d,]+)',
-        r'Contribución\tde\totros\tmeses.*?([-\d,]+)',
-        r'Contribución de otros meses.*?(?<!")(\d+)(?!")',
-        r'Contribución\tde\totros\tmeses.*?(?<!")(\d+)(?!")'
-    ],
-    'subtotal_energia_contribucion_kwh': [
-        r'\$\/kWh,\$\s*Subtotal\s*energia\s*\+\s*contribución,\s*([-\d.,]+)',
-        r'\$\/kWh,\$\s*Subtotal\tenerg[ií]a\t\+\tcontribución,\s*([-\d.,]+)'
-    ],
-    'subtotal_energia_contribucion_pesos': [
-     # NUEVOS PATRONES CORREGIDOS - Capturar el segundo valor después de la coma
-        r'Subtotal\s+energia\s*\+\s*contribuciÃ³n[,\s]*[\d.]+[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\tenerg[ií]a\t\+\tcontribuciÃ³n[,\s]*[\d.]+[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\s+energia\s*\+\s*contribución[,\s]*[\d.]+[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\tenergía\t\+\tcontribución[,\s]*[\d.]+[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        # Patrón más específico para el formato exacto del ejemplo
-        r'Subtotal\s+energia\s*\+\s*contribuciÃ³n,[\d.]+,"([0-9,]+(?:\.\d+)?)"',
-        r'Subtotal\tenerg[ií]a\t\+\tcontribuciÃ³n,[\d.]+,"([0-9,]+(?:\.\d+)?)"',
-        # Patrones alternativos para capturar el segundo valor
-        r'Subtotal\s+energia\s*\+\s*contribuciÃ³n[,\s]*[^,]+[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Subtotal\tenerg[ií]a\t\+\tcontribuciÃ³n[,\s]*[^,]+[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos como respaldo (modificados para evitar capturar el primer valor)
-        r'\$\/kWh,\$\s*Subtotal\s*energia\s*\+\s*contribución,\s*[-\d.,]+,\s*"([-\d,]+)"',
-        r'\$\/kWh,\$\s*Subtotal\tenerg[ií]a\t\+\tcontribución,\s*[-\d.,]+,\s*"([-\d,]+)"',
-        r'\$\/kWh,\$\s*Subtotal\s*energia\s*\+\s*contribución,\s*[-\d.,]+,\s*(?<!")(\d+)(?!")',
-        r'\$\/kWh,\$\s*Subtotal\tenerg[ií]a\t\+\tcontribución,\s*[-\d.,]+,\s*(?<!")(\d+)(?!")'
-    ],
-    'otros_cobros': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Otros\s+cobros[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Otros\tcobros[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Otros\s+cobros[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Otros\tcobros[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Otros cobros.*?"([-\d,]+)"',
-        r'Otros\tcobros.*?"([-\d,]+)"',
-        r'Otros cobros.*?(?<!")(\d+)(?!")',
-        r'Otros\tcobros.*?(?<!")(\d+)(?!")'
-    ],
-    'sobretasa': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Sobretasa[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Sobretasa[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Sobretasa.*?([-\d,]+)',
-        r'Sobretasa.*?(?<!")(\d+)(?!")'
-    ],
-    'ajustes_cargos_regulados': [
-        r'Ajustes\s+cargos\s+regulados[,\s]*"?([-0-9.,]+)"?',
-        r'Ajustes\s+cargos\s+regulados[,\s]*"(-[\d,.]+)"',
-        r'Ajustes\tcargos\tregulados[,\s]*"(-[\d,.]+)"',
-        r'Ajustes\scargos\sregulados,\s*"(-[\d,.]+)"',
-        r'Ajustes\tcargos\tregulados,\s*"(-[\d,.]+)"',
-        r'Ajustes cargos regulados.*?"([-\d,]+)"',
-        r'Ajustes\tcargos\tregulados.*?"([-\d,]+)"',
-        r'Ajustes cargos regulados.*?(?<!")(-?\d+)(?!")',
-        r'Ajustes\tcargos\tregulados.*?(?<!")(-?\d+)(?!")'
-    ],
-    'compensaciones': [
-        r'Compensaciones[,\s]*"?([-0-9,]+(?:\.\d+)?)"?',
-        r'Compensaciones.*?"([-\d,]+)"',
-        r'Compensaciones.*?(?<!")(\d+)(?!")'
-    ],
-    'saldo_cartera': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Saldo\s+cartera[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Saldo\tcartera[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Saldo\s+cartera[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Saldo\tcartera[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Saldo cartera.*?"([-\d,]+)"',
-        r'Saldo\tcartera.*?([-\d,]+)',
-        r'Saldo cartera.*?(?<!")(\d+)(?!")',
-        r'Saldo\tcartera.*?(?<!")(\d+)(?!")'
-    ],
-    'interes_mora': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'InterÃ©s\s+por\s+Mora[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Interés\s+por\s+Mora[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Interés\tpor\tMora[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'InterÃ©s\s+por\s+Mora[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Interés\s+por\s+Mora[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Interés\tpor\tMora[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Interés por Mora.*?"([-\d,]+)"',
-        r'Interés\tpor\tMora.*?"([-\d,]+)"',
-        r'Interés por Mora.*?(?<!")(\d+)(?!")',
-        r'Interés\tpor\tMora.*?(?<!")(\d+)(?!")'
-    ],
-    'recobros': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Recobros[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Recobros[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Recobros.*?([-\d,]+)',
-        r'Recobros.*?(?<!")(\d+)(?!")'
-    ],
-    'alumbrado_publico': [
-        # Nuevos patrones mejorados para capturar el valor completo con decimales
-        r'Alumbrado\s+pÃºblico\s+\(\*\*\)[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Alumbrado\s+público\s+\(\*\*\)[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Alumbrado\s+pÃºblico[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Alumbrado\s+público[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Alumbrado\tpúblico[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Alumbrado\tpÃºblico[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        # Patrones con comillas opcionales
-        r'Alumbrado\s+pÃºblico\s+\(\*\*\)[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Alumbrado\s+público[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Alumbrado público.*?([-\d,]+)',
-        r'Alumbrado\tpúblico.*?"([-\d,]+)"',
-        r'Alumbrado público.*?(?<!")(\d+)(?!")',
-        r'Alumbrado\tpúblico.*?(?<!")(\d+)(?!")'
-    ],
-    'impuesto_alumbrado_publico': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Impuesto\s+alumbrado\s+pÃºblico[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Impuesto\s+alumbrado\s+público[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Impuesto\talumbrado\tpúblico[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Impuesto\talumbrado\tpÃºblico[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Impuesto\s+alumbrado\s+pÃºblico[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Impuesto\s+alumbrado\s+público[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Impuesto\talumbrado\tpúblico[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Impuesto\talumbrado\tpÃºblico[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos
-        r'Impuesto alumbrado público.*?([-\d,]+)',
-        r'Impuesto\talumbrado\tpúblico.*?"([-\d,]+)"',
-        r'Impuesto alumbrado público.*?(?<!")(\d+)(?!")',
-        r'Impuesto\talumbrado\tpúblico.*?(?<!")(\d+)(?!")'
-    ],
-    'ajuste_iap_otros_meses': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Ajuste\s+IAP\s+otros\s+meses[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Ajuste\tIAP\totros\tmeses[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Ajuste\s+IAP\s+otros\s+meses[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Ajuste\tIAP\totros\tmeses[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Ajuste IAP otros meses.*?([-\d,]+)',
-        r'Ajuste\tIAP\totros\tmeses.*?"([-\d,]+)"',
-        r'Ajuste IAP otros meses.*?(?<!")(\d+)(?!")',
-        r'Ajuste\tIAP\totros\tmeses.*?(?<!")(\d+)(?!")'
-    ],
-    'convivencia_ciudadana': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Convivencia\s+ciudadana\s+\(\*\*\*\)[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Convivencia\s+ciudadana[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Convivencia\tciudadana[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Convivencia\s+ciudadana\s+\(\*\*\*\)[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Convivencia\s+ciudadana[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Convivencia\tciudadana[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos
-        r'Convivencia ciudadana.*?"([-\d,]+)"',
-        r'Convivencia\tciudadana.*?"([-\d,]+)"',
-        r'Convivencia ciudadana.*?(?<!")(\d+)(?!")',
-        r'Convivencia\tciudadana.*?(?<!")(\d+)(?!")'
-    ],
-    'tasa_especial_convivencia': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Tasa\s+especial\s+convivencia\s+ciudadana[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Tasa\tespecial\tconvivencia\tciudadana[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Tasa\s+especial\s+convivencia\s+ciudadana[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Tasa\tespecial\tconvivencia\tciudadana[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Tasa especial convivencia ciudadana.*?"([-\d,]+)"',
-        r'Tasa\tespecial\tconvivencia\tciudadana.*?"([-\d,]+)"',
-        r'Tasa especial convivencia ciudadana.*?(?<!")(\d+)(?!")',
-        r'Tasa\tespecial\tconvivencia\tciudadana.*?(?<!")(\d+)(?!")'
-    ],
-    'ajuste_tasa_convivencia': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Ajuste\s+tasa\s+convivencia\s+otros\s+meses[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Ajuste\ttasa\tconvivencia\totros\tmeses[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Ajuste\s+tasa\s+convivencia\s+otros\s+meses[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Ajuste\ttasa\tconvivencia\totros\tmeses[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Ajuste tasa convivencia otros meses.*?"([-\d,]+)"',
-        r'Ajuste\ttasa\tconvivencia\totros\tmeses.*?"([-\d,]+)"',
-        r'Ajuste tasa convivencia otros meses.*?(?<!")(\d+)(?!")',
-        r'Ajuste\ttasa\tconvivencia\totros\tmeses.*?(?<!")(\d+)(?!")'
-    ],
-    'total_servicio_energia_impuestos': [
-        # Nuevos patrones mejorados
-        r'Total\s+servicio\s+energÃ­a\s+\+\s+impuestos[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Total\s+servicio\s+energía\s+\+\s+impuestos[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Total\tservicio\tenergía\t\+\timpuestos[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Total\tservicio\tenergÃ­a\t\+\timpuestos[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Total\s+servicio\s+energÃ­a\s+\+\s+impuestos[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Total\s+servicio\s+energía\s+\+\s+impuestos[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos
-        r'Total servicio energía \+ impuestos.*?"([-\d,]+)"',
-        r'Total\tservicio\tenergía\t\+\timpuestos.*?"([-\d,]+)"',
-        r'Total\tservicio\tenergía\t\\\+\timpuestos.*?"([-\d,]+)"',
-        r'Total servicio energía \+ impuestos.*?(?<!")(\d+)(?!")',
-        r'Total\tservicio\tenergía\t\+\timpuestos.*?(?<!")(\d+)(?!")',
-        r'Total\tservicio\tenergía\t\\\+\timpuestos.*?(?<!")(\d+)(?!")'
-    ],
-    'ajuste_decena': [
-        # Nuevos patrones mejorados para capturar valores negativos, decimales y grandes
-        r'Ajuste\s+a\s+la\s+decena[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        r'Ajuste\ta\tla\tdecena[,\s]*"([-0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Ajuste\s+a\s+la\s+decena[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        r'Ajuste\ta\tla\tdecena[,\s]*"?(-?[0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos por compatibilidad
-        r'Ajuste a la decena.*?([-\d,]+)',
-        r'Ajuste\ta\tla\tdecena.*?([-\d,]+)',
-        r'Ajuste a la decena.*?(?<!")(\d+)(?!")',
-        r'Ajuste\ta\tla\tdecena.*?(?<!")(\d+)(?!")'
-    ],
-    'neto_pagar': [
-        # Nuevos patrones mejorados
-        r'Neto\s+a\s+pagar[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        r'Neto\ta\tpagar[,\s]*"([0-9,]+(?:\.\d+)?)"',
-        # Con comillas opcionales
-        r'Neto\s+a\s+pagar[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        # Patrones antiguos
-        r'Neto a pagar.*?"([-\d,]+)"',
-        r'Neto\ta\tpagar.*?"([-\d,]+)"',
-        r'Neto a pagar.*?(?<!")(\d+)(?!")',
-        r'Neto\ta\tpagar.*?(?<!")(\d+)(?!")'
-    ],
-    'energia_reactiva_inductiva': [
-        r'Energ[ií]a\s*reactiva\s*inductiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Energ[ií]a\treactiva\tinductiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Energ[ií]a\s*reactiva\s*inductiva[,\s]*(?<!")([0-9.,]+)(?!")',
-        r'Energ[ií]a\treactiva\tinductiva[,\s]*(?<!")([0-9.,]+)(?!")'
-    ],
-    'energia_reactiva_capacitiva': [
-        r'Energ[ií]a\s*reactiva\s*capacitiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Energ[ií]a\treactiva\tcapacitiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Energ[ií]a\s*reactiva\s*capacitiva[,\s]*(?<!")([0-9.,]+)(?!")',
-        r'Energ[ií]a\treactiva\tcapacitiva[,\s]*(?<!")([0-9.,]+)(?!")'
-    ],
-    'total_energia_reactiva': [
-        r'Total\s*energ[ií]a\s*reactiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Total\tenerg[ií]a\treactiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Total\s*energ[ií]a\s*reactiva[,\s]*(?<!")([0-9.,]+)(?!")',
-        r'Total\tenerg[ií]a\treactiva[,\s]*(?<!")([0-9.,]+)(?!")'
-    ],
-    'energia_activa': [
-        r'Energ[ií]a\s*activa[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Energ[ií]a\tactiva[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
-        r'Energ[ií]a\s*activa[,\s]*(?<!")([0-9.,]+)(?!")',
-        r'Energ[ií]a\tactiva[,\s]*(?<!")([0-9.,]+)(?!")'
-    ]
-}
-
-# Patrones para componentes de energía - soporta formato viejo y nuevo
-COMPONENTES_ENERGIA = [
-    {
-        "name": "Generación",
-        "patterns": [
-            # Formato viejo con kWh
-            r'1\.\s+Generación,"?([-\d,]*)"?,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?',
-            # Formato nuevo sin kWh
-            r'1\.\s+Generación,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": True  # Indica que puede tener kWh en formato viejo
-    },
-    {
-        "name": "Comercialización",
-        "patterns": [
-            r'2\.\s+Comercialización,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": False
-    },
-    {
-        "name": "Transmisión",
-        "patterns": [
-            r'3\.\s+Transmisión,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": False
-    },
-    {
-        "name": "Distribución",
-        "patterns": [
-            r'4\.\s+Distribución,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": False
-    },
-    {
-        "name": "Pérdidas",
-        "patterns": [
-            r'5\.\s+Perdidas\s+\(\*\),([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?',
-            r'5\.\s+Pérdidas\s+\(\*\),([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": False
-    },
-    {
-        "name": "Restricciones",
-        "patterns": [
-            r'6\.\s+Restricciones,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": False
-    },
-    {
-        "name": "Otros cargos",
-        "patterns": [
-            r'7\.\s+Otros\s+cargos,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": False
-    },
-    {
-        "name": "Energía inductiva + capacitiva",
-        "patterns": [
-            # Formato viejo con kWh primero
-            r'8\.\s+Energía\s+inductiva\s+\+\s+capacitiva\s+facturada,"?([-\d,]*)"?,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?',
-            # Formato nuevo sin kWh
-            r'8\.\s+Energía\s+inductiva\s+\+\s+capacitiva\s+facturada,([-\d\.]+),"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?'
-        ],
-        "has_kwh": True  # Puede tener kWh en formato viejo
-    }
-]
-
-# Patrones para extraer los parámetros específicos datos OR
-PATRONES_PARAMETROS_ESPECIFICOS = {
-    'ir': [
-        # PATRONES CORREGIDOS PARA IR
-        # Patrón específico para cuando IR está vacío seguido de coma y luego Grupo
-        r'IR:\s*,\s*Grupo:',  # Este patrón detecta cuando IR está vacío
-        # Patrón para cuando IR tiene un valor antes de la coma
-        r'IR:\s*(\d+(?:\.\d+)?)\s*,',  # Captura el valor de IR solo si hay un número antes de la coma
-        r'IR:\s+(\d+(?:\.\d+)?)\s*(?:,|$)',  # IR con espacio y valor, seguido de coma o fin de línea
-        # Patrón para IR sin coma después (al final de línea)
-        r'IR:\s*(\d+(?:\.\d+)?)\s*$'
-    ],
-    'grupo': [
-        r'Grupo:\s*(?:,|\s+)(\d+)',
-        r'Grupo:,(\d+)',
-        r'Grupo:\s*(\d+)'
-    ],
-    'diu_int': [
-        r'DIU\s+INT:\s*([\d\.]+)',
-        r'DIU INT:\s*(?:,|\s+)([^,\s]+)',
-        r'DIU INT:,([^,]+)'
-    ],
-    'dium_int': [
-        r'DIUM\s+INT:\s*([\d\.]+)',
-        r'DIUM INT:\s*(?:,|\s+)([^,\s]+)',
-        r'DIUM INT:,([^,]+)'
-    ],
-    'fiu_int': [
-        r'FIU\s+INT:\s*([\d\.]+)',
-        r'FIU INT:\s*(?:,|\s+)([^,\s]+)',
-        r'FIU INT:,([^,]+)'
-    ],
-    'fium_int': [
-        r'FIUM\s+INT:\s*([\d\.]+)',
-        r'FIUM INT:\s*(?:,|\s+)([^,\s]+)',
-        r'FIUM INT:,([^,]+)'
-    ],
-    'fiug': [
-        r'FIUG:\s*(?:,|\s+)([\d.]+)',
-        r'FIUG:\s*([\d.]+)',
-        r'FIUG:\s*([\d.]+),\s*DIUG:\s*([\d.]+)'  # Patrón combinado
-    ],
-    'diug': [
-        r'DIUG:\s*(?:,|\s+)([\d.]+)',
-        r'DIUG:\s*([\d.]+)',
-        r'FIUG:\s*([\d.]+),\s*DIUG:\s*([\d.]+)'  # Patrón combinado
-    ],
-    # Nuevos patrones combinados para extraer valores de la misma línea
-    'diu_dium_int': [
-        r'DIU\s+INT:\s*([\d\.]+),DIUM\s+INT:\s*([\d\.]+)'
-    ],
-    'fiu_fium_int': [
-        r'FIU\s+INT:\s*([\d\.]+),FIUM\s+INT:\s*([\d\.]+)'
-    ]
-}
\ No newline at end of file
+"""
+Módulo con todos los patrones regex para extracción de datos de facturas.
+Este módulo centraliza todos los patrones de expresiones regulares utilizados
+para extraer información de las facturas de energía.
+
+Estrategia de arranque: importar este módulo no compila ningún patrón;
+las fuentes son cadenas y cada patrón se compila una sola vez en su primer
+uso (ver _PatronesPerezosos). Los patrones compilados de re/regex viven
+solo en memoria y no se pueden serializar a disco, así que no hay una base
+de datos precompilada que cargar: el costo de arranque se elimina
+difiriendo la compilación, no adelantándola.
+"""
+
+# El módulo regex de PyPI es un reemplazo compatible de re con un motor
+# más rápido para alternativas grandes como las de este módulo; si no está
+# instalado se usa re de la librería estándar sin cambio de comportamiento
+import os
+import sys
+from collections import Counter
+from types import MappingProxyType
+
+try:
+    import regex as re
+except ImportError:
+    import re
+
+
+def _patrones_etiqueta(etiqueta, signo=True, viejo_comillas=True, sufijo=None):
+    """
+    Genera las variantes estándar de patrón para una etiqueta de concepto.
+
+    Emite las mismas variantes que antes se escribían a mano por concepto:
+    etiqueta con espacios o con tabuladores, valor con comillas opcionales
+    (la captura nunca incluye las comillas), y las variantes antiguas con
+    .*? mantenidas por compatibilidad con facturas viejas.
+
+    Args:
+        etiqueta (str): Etiqueta limpia del concepto (palabras con espacios)
+        signo (bool): Si el valor puede ser negativo
+        viejo_comillas (bool): Si las variantes antiguas exigen comillas
+                               alrededor del valor
+        sufijo (str, optional): Fragmento regex que puede seguir a la
+                                etiqueta (p. ej. r'\(\*\*\)')
+
+    Returns:
+        list: Lista de patrones (str) en el orden de prioridad habitual
+    """
+    tokens = [re.escape(token) for token in etiqueta.split()]
+    espacios = r'\s+'.join(tokens)
+    tabs = r'\t'.join(tokens)
+    literal = ' '.join(tokens)
+
+    # Para etiquetas de una sola palabra ambas formas coinciden: no
+    # duplicar las variantes
+    formas = (espacios,) if tabs == espacios else (espacios, tabs)
+    formas_viejas = (literal,) if tabs == espacios else (literal, tabs)
+
+    valor_opcional = (r'-?' if signo else '') + r'[0-9,]+(?:\.\d+)?'
+
+    patrones = []
+
+    # Valor con comillas opcionales. La variante de comillas obligatorias
+    # que se escribía a mano era un subconjunto de esta (la captura nunca
+    # incluye las comillas), así que solo queda la rama opcional: menos
+    # alternativas que probar por posición para el motor
+    if sufijo:
+        patrones.append(r'%s\s+%s[,\s]*"?(%s)"?' % (espacios, sufijo, valor_opcional))
+    for forma in formas:
+        patrones.append(r'%s[,\s]*"?(%s)"?' % (forma, valor_opcional))
+
+    # Variantes antiguas mantenidas por compatibilidad
+    for forma in formas_viejas:
+        if viejo_comillas:
+            patrones.append(r'%s.*?"([-\d,]+)"' % forma)
+        else:
+            patrones.append(r'%s.*?([-\d,]+)' % forma)
+    for forma in formas_viejas:
+        # Equivalente consumido de .*?(?<!")(\d+): el grupo opcional exige
+        # un carácter que no sea comilla ni dígito justo antes del valor,
+        # sin usar lookbehind (que frena el escaneo rápido del motor)
+        patrones.append(r'%s(?:.*?[^"\d])?(\d+)(?!")' % forma)
+
+    return patrones
+
+
+def _patrones_energia(tokens):
+    """
+    Genera las variantes de patrón para las etiquetas de energía.
+
+    Estas etiquetas usan fragmentos regex como Energ[ií]a, por lo que los
+    tokens se reciben ya en forma de regex y se unen con \\s* o \\t.
+
+    Args:
+        tokens (list): Fragmentos regex de la etiqueta, uno por palabra
+
+    Returns:
+        list: Lista de patrones (str) en el orden de prioridad habitual
+    """
+    espacios = r'\s*'.join(tokens)
+    tabs = r'\t'.join(tokens)
+    # Exigir al menos un separador antes del valor hace redundante el
+    # antiguo lookbehind (?<!"): el carácter previo ya no puede ser comilla
+    return [
+        r'%s[,\s]*"?([0-9,]+(?:\.\d+)?)"?' % espacios,
+        r'%s[,\s]*"?([0-9,]+(?:\.\d+)?)"?' % tabs,
+        r'%s[,\s]+([0-9.,]+)(?!")' % espacios,
+        r'%s[,\s]+([0-9.,]+)(?!")' % tabs,
+    ]
+
+
+# Patrones regex centralizados para extracción de datos generales. Las
+# etiquetas con variantes uniformes se generan con los constructores de
+# arriba; los conceptos con patrones irregulares se mantienen literales.
+PATRONES_CONCEPTO = {
+    'subtotal_base_energia': _patrones_etiqueta('Subtotal base energía', signo=False),
+    'contribucion': _patrones_etiqueta('Contribución'),
+    'contribucion_otros_meses': [
+        r'Contribución\s+de\s+otros\s+meses[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
+        r'Contribución de otros meses.*?([-\d,]+)',
+        r'Contribución\tde\totros\tmeses.*?([-\d,]+)',
+        r'Contribución de otros meses(?:.*?[^"\d])?(\d+)(?!")',
+        r'Contribución\tde\totros\tmeses(?:.*?[^"\d])?(\d+)(?!")'
+    ],
+    'subtotal_energia_contribucion_kwh': [
+        r'\$\/kWh,\$\s*Subtotal\s*energia\s*\+\s*contribución,\s*([-\d.,]+)',
+        r'\$\/kWh,\$\s*Subtotal\tenerg[ií]a\t\+\tcontribución,\s*([-\d.,]+)'
+    ],
+    'subtotal_energia_contribucion_pesos': [
+        # Capturar el segundo valor después de la coma; las comillas son
+        # opcionales y la captura nunca las incluye
+        r'Subtotal\s+energia\s*\+\s*contribución[,\s]*[^,]+[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
+        r'Subtotal\tenerg[ií]a\t\+\tcontribución[,\s]*[^,]+[,\s]*"?([0-9,]+(?:\.\d+)?)"?',
+        # Patrones antiguos como respaldo (modificados para evitar capturar el primer valor)
+        r'\$\/kWh,\$\s*Subtotal\s*energia\s*\+\s*contribución,\s*[-\d.,]+,\s*"([-\d,]+)"',
+        r'\$\/kWh,\$\s*Subtotal\tenerg[ií]a\t\+\tcontribución,\s*[-\d.,]+,\s*"([-\d,]+)"',
+        # El separador "," ya garantiza que el carácter previo al valor no
+        # es una comilla, así que el antiguo lookbehind (?<!") sobra
+        r'\$\/kWh,\$\s*Subtotal\s*energia\s*\+\s*contribución,\s*[-\d.,]+,\s*(\d+)(?!")',
+        r'\$\/kWh,\$\s*Subtotal\tenerg[ií]a\t\+\tcontribución,\s*[-\d.,]+,\s*(\d+)(?!")'
+    ],
+    'otros_cobros': _patrones_etiqueta('Otros cobros'),
+    'sobretasa': _patrones_etiqueta('Sobretasa', viejo_comillas=False),
+    'ajustes_cargos_regulados': [
+        # Comillas opcionales: cubre también las antiguas variantes con
+        # comillas obligatorias alrededor de valores negativos
+        r'Ajustes\s+cargos\s+regulados[,\s]*"?([-0-9.,]+)"?',
+        r'Ajustes\tcargos\tregulados[,\s]*"?([-0-9.,]+)"?',
+        r'Ajustes cargos regulados.*?"([-\d,]+)"',
+        r'Ajustes\tcargos\tregulados.*?"([-\d,]+)"',
+        # El signo se excluye del carácter previo para no partir un valor
+        # negativo al reescribir el lookbehind en forma consumida
+        r'Ajustes cargos regulados(?:.*?[^"\d-])?(-?\d+)(?!")',
+        r'Ajustes\tcargos\tregulados(?:.*?[^"\d-])?(-?\d+)(?!")'
+    ],
+    'compensaciones': [
+        r'Compensaciones[,\s]*"?([-0-9,]+(?:\.\d+)?)"?',
+        r'Compensaciones.*?"([-\d,]+)"',
+        r'Compensaciones(?:.*?[^"\d])?(\d+)(?!")'
+    ],
+    'saldo_cartera': _patrones_etiqueta('Saldo cartera'),
+    'interes_mora': _patrones_etiqueta('Interés por Mora'),
+    'recobros': _patrones_etiqueta('Recobros', viejo_comillas=False),
+    'alumbrado_publico': _patrones_etiqueta('Alumbrado público', signo=False, sufijo=r'\(\*\*\)'),
+    'impuesto_alumbrado_publico': _patrones_etiqueta('Impuesto alumbrado público'),
+    'ajuste_iap_otros_meses': _patrones_etiqueta('Ajuste IAP otros meses'),
+    'convivencia_ciudadana': _patrones_etiqueta('Convivencia ciudadana', sufijo=r'\(\*\*\*\)'),
+    'tasa_especial_convivencia': _patrones_etiqueta('Tasa especial convivencia ciudadana'),
+    'ajuste_tasa_convivencia': _patrones_etiqueta('Ajuste tasa convivencia otros meses'),
+    'total_servicio_energia_impuestos': _patrones_etiqueta('Total servicio energía + impuestos', signo=False),
+    'ajuste_decena': _patrones_etiqueta('Ajuste a la decena', viejo_comillas=False),
+    'neto_pagar': _patrones_etiqueta('Neto a pagar', signo=False),
+    'energia_reactiva_inductiva': _patrones_energia(['Energ[ií]a', 'reactiva', 'inductiva']),
+    'energia_reactiva_capacitiva': _patrones_energia(['Energ[ií]a', 'reactiva', 'capacitiva']),
+    'total_energia_reactiva': _patrones_energia(['Total', 'energ[ií]a', 'reactiva']),
+    'energia_activa': _patrones_energia(['Energ[ií]a', 'activa']) + [
+        # Variante con comillas dobladas dentro de la celda
+        r'"Energ[ií]a\tactiva,""([0-9.,]+)"""'
+    ]
+}
+
+# Patrones para componentes de energía - soporta formato viejo y nuevo.
+# Contenedores congelados: las estructuras son de solo lectura, no entran
+# al recolector generacional y los workers bajo fork las comparten sin
+# fallos de copy-on-write
+COMPONENTES_ENERGIA = tuple(MappingProxyType(componente) for componente in [
+    {
+        "name": "Generación",
+        "has_kwh": True  # Indica que puede tener kWh en formato viejo
+    },
+    {
+        "name": "Comercialización",
+        "has_kwh": False
+    },
+    {
+        "name": "Transmisión",
+        "has_kwh": False
+    },
+    {
+        "name": "Distribución",
+        "has_kwh": False
+    },
+    {
+        "name": "Pérdidas",
+        "has_kwh": False
+    },
+    {
+        "name": "Restricciones",
+        "has_kwh": False
+    },
+    {
+        "name": "Otros cargos",
+        "has_kwh": False
+    },
+    {
+        "name": "Energía inductiva + capacitiva",
+        "has_kwh": True  # Puede tener kWh en formato viejo
+    }
+])
+
+# Todas las filas numeradas comparten la misma estructura de columnas; en
+# vez de un patrón por componente, una sola regex estructural captura el
+# número (que identifica el componente), la etiqueta, la columna opcional
+# de kWh del formato viejo y las cuatro columnas monetarias
+PATRON_FILA_COMPONENTE = re.compile(
+    r'^([1-8])\.\s+([^,]+),(?:"?([-\d,]*)"?,)?([-\d\.]+),'
+    r'"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?,"?([-\d,]+\.?\d*)"?',
+    re.MULTILINE
+)
+
+# Mapa número de fila -> entrada de COMPONENTES_ENERGIA
+COMPONENTES_POR_NUMERO = MappingProxyType({
+    indice + 1: componente
+    for indice, componente in enumerate(COMPONENTES_ENERGIA)
+})
+
+# Patrones para extraer los parámetros específicos datos OR
+PATRONES_PARAMETROS_ESPECIFICOS = {
+    'ir': [
+        # PATRONES CORREGIDOS PARA IR
+        # Patrón específico para cuando IR está vacío seguido de coma y luego Grupo
+        r'IR:\s*,\s*Grupo:',  # Este patrón detecta cuando IR está vacío
+        # Patrón para cuando IR tiene un valor antes de la coma
+        r'IR:\s*(\d+(?:\.\d+)?)\s*,',  # Captura el valor de IR solo si hay un número antes de la coma
+        r'IR:\s+(\d+(?:\.\d+)?)\s*(?:,|$)',  # IR con espacio y valor, seguido de coma o fin de línea
+        # Patrón para IR sin coma después (al final de línea)
+        r'IR:\s*(\d+(?:\.\d+)?)\s*$'
+    ],
+    'grupo': [
+        r'Grupo:\s*(?:,|\s+)(\d+)',
+        r'Grupo:,(\d+)',
+        r'Grupo:\s*(\d+)'
+    ],
+    'diu_int': [
+        r'DIU\s+INT:\s*([\d\.]+)',
+        r'DIU INT:\s*(?:,|\s+)([^,\s]+)',
+        r'DIU INT:,([^,]+)'
+    ],
+    'dium_int': [
+        r'DIUM\s+INT:\s*([\d\.]+)',
+        r'DIUM INT:\s*(?:,|\s+)([^,\s]+)',
+        r'DIUM INT:,([^,]+)'
+    ],
+    'fiu_int': [
+        r'FIU\s+INT:\s*([\d\.]+)',
+        r'FIU INT:\s*(?:,|\s+)([^,\s]+)',
+        r'FIU INT:,([^,]+)'
+    ],
+    'fium_int': [
+        r'FIUM\s+INT:\s*([\d\.]+)',
+        r'FIUM INT:\s*(?:,|\s+)([^,\s]+)',
+        r'FIUM INT:,([^,]+)'
+    ],
+    'fiug': [
+        r'FIUG:\s*(?:,|\s+)([\d.]+)',
+        r'FIUG:\s*([\d.]+)',
+        r'FIUG:\s*([\d.]+),\s*DIUG:\s*([\d.]+)'  # Patrón combinado
+    ],
+    'diug': [
+        r'DIUG:\s*(?:,|\s+)([\d.]+)',
+        r'DIUG:\s*([\d.]+)',
+        r'FIUG:\s*([\d.]+),\s*DIUG:\s*([\d.]+)'  # Patrón combinado
+    ],
+    # Nuevos patrones combinados para extraer valores de la misma línea
+    'diu_dium_int': [
+        r'DIU\s+INT:\s*([\d\.]+),DIUM\s+INT:\s*([\d\.]+)'
+    ],
+    'fiu_fium_int': [
+        r'FIU\s+INT:\s*([\d\.]+),FIUM\s+INT:\s*([\d\.]+)'
+    ]
+}
+
+# Subcadena literal presente en cualquier coincidencia de los patrones de
+# cada parámetro: comprobarla con "in" (búsqueda de subcadenas en C) antes
+# de lanzar el motor de regex permite saltar los parámetros ausentes del
+# contenido casi gratis
+PREFILTROS_PARAMETROS = MappingProxyType({
+    'ir': 'IR:',
+    'grupo': 'Grupo:',
+    'diu_int': 'DIU',
+    'dium_int': 'DIUM',
+    'fiu_int': 'FIU',
+    'fium_int': 'FIUM',
+    'fiug': 'FIUG:',
+    'diug': 'DIUG:',
+    'diu_dium_int': 'DIUM',
+    'fiu_fium_int': 'FIUM'
+})
+
+
+class _PatronesPerezosos(dict):
+    """
+    Diccionario que compila los patrones de una clave en su primer uso.
+
+    Los valores empiezan como cadenas (o tuplas de cadenas) y se
+    reemplazan por sus versiones compiladas la primera vez que se piden,
+    de modo que importar el módulo no paga el costo de compilar los ~200
+    patrones y los conceptos que nunca se consultan no se compilan.
+    """
+
+    def __getitem__(self, clave):
+        valor = dict.__getitem__(self, clave)
+        if isinstance(valor, str):
+            valor = re.compile(valor)
+            dict.__setitem__(self, clave, valor)
+        elif isinstance(valor, tuple) and valor and isinstance(valor[0], str):
+            valor = tuple(re.compile(patron) for patron in valor)
+            dict.__setitem__(self, clave, valor)
+        return valor
+
+
+def _combinar_alternativas(lista):
+    """
+    Une las alternativas de un concepto en un solo patrón.
+
+    Cada alternativa captura exactamente un grupo, así que el valor del
+    concepto se recupera con match.group(match.lastindex) sin importar
+    cuál alternativa coincidió.
+
+    Args:
+        lista (list): Lista de patrones (str) de un concepto
+
+    Returns:
+        str: Patrón con todas las alternativas unidas por |
+    """
+    return '|'.join('(?:%s)' % patron for patron in lista)
+
+
+# Un solo patrón por concepto: el contenido se recorre una vez por concepto
+# en lugar de una vez por cada variante de patrón
+PATRONES_CONCEPTO_COMBINADOS = _PatronesPerezosos({
+    sys.intern(clave): _combinar_alternativas(lista)
+    for clave, lista in PATRONES_CONCEPTO.items()
+})
+
+# Copia con los patrones fuente (str) para construir el escáner combinado,
+# ya que el diccionario público se reemplaza abajo por la versión perezosa
+_PATRONES_CONCEPTO_FUENTE = dict(PATRONES_CONCEPTO)
+
+_PATRON_ESCANEO = None
+
+# Contador opcional de variantes acertadas, activado con la variable de
+# entorno FACTURAS_PERFIL_PATRONES. Cada alternativa de un concepto captura
+# exactamente un grupo, así que lastindex identifica la variante que
+# coincidió. Tras una corrida de entrenamiento sobre facturas reales, las
+# listas deben reordenarse con las variantes más frecuentes primero: la
+# alternación se prueba de izquierda a derecha y el orden actual ya asume
+# que el formato nuevo es el caso caliente.
+CONTADOR_VARIANTES = Counter() if os.environ.get('FACTURAS_PERFIL_PATRONES') else None
+
+
+def _obtener_patron_escaneo():
+    """
+    Compila (una sola vez, en el primer uso) el escáner combinado.
+
+    El escáner tiene un grupo nombrado por concepto y permite localizar
+    todos los conceptos en una sola pasada sobre el contenido. Las claves
+    más largas van primero para que un concepto cuyo rótulo extiende al de
+    otro (contribucion_otros_meses frente a contribucion) tenga prioridad
+    en la misma posición.
+
+    Returns:
+        re.Pattern: Patrón combinado de todos los conceptos
+    """
+    global _PATRON_ESCANEO
+    if _PATRON_ESCANEO is None:
+        _PATRON_ESCANEO = re.compile('|'.join(
+            '(?P<%s>%s)' % (clave, _combinar_alternativas(_PATRONES_CONCEPTO_FUENTE[clave]))
+            for clave in sorted(_PATRONES_CONCEPTO_FUENTE, key=len, reverse=True)
+        ))
+    return _PATRON_ESCANEO
+
+
+def escanear_conceptos(content):
+    """
+    Localiza todos los conceptos del contenido en una sola pasada.
+
+    En lugar de buscar cada concepto por separado (una pasada completa por
+    concepto), se recorre el contenido una vez con el patrón combinado y se
+    registra la primera aparición de cada concepto. El valor capturado se
+    recupera re-anclando el patrón del concepto en la posición encontrada.
+
+    Args:
+        content (str): Contenido del archivo CSV
+
+    Returns:
+        dict: Diccionario concepto -> valor capturado (str) para los
+              conceptos presentes en el contenido
+    """
+    resultados = {}
+    patron_escaneo = _obtener_patron_escaneo()
+    groupindex = patron_escaneo.groupindex
+
+    for match in patron_escaneo.finditer(content):
+        for clave, indice in groupindex.items():
+            if match.group(indice) is not None:
+                if clave not in resultados:
+                    submatch = PATRONES_CONCEPTO_COMBINADOS[clave].match(content, match.start())
+                    if submatch and submatch.lastindex:
+                        if CONTADOR_VARIANTES is not None:
+                            CONTADOR_VARIANTES[(clave, submatch.lastindex)] += 1
+                        # Internar la clave para que el diccionario de
+                        # resultados comparta los mismos objetos que los
+                        # diccionarios de patrones
+                        resultados[sys.intern(clave)] = submatch.group(submatch.lastindex)
+                break
+
+    # finditer no entrega coincidencias solapadas: si dos conceptos
+    # extraen de la misma línea (p. ej. subtotal energía + contribución
+    # en $/kWh y en pesos), el primero consume el tramo y el segundo
+    # queda fuera de la pasada. Los conceptos sin resultado se reintentan
+    # con su patrón combinado; son el caso raro, así que el costo extra
+    # es acotado y nunca mayor que la búsqueda por concepto original.
+    for clave in PATRONES_CONCEPTO_COMBINADOS:
+        if clave not in resultados:
+            submatch = PATRONES_CONCEPTO_COMBINADOS[clave].search(content)
+            if submatch and submatch.lastindex:
+                if CONTADOR_VARIANTES is not None:
+                    CONTADOR_VARIANTES[(clave, submatch.lastindex)] += 1
+                resultados[sys.intern(clave)] = submatch.group(submatch.lastindex)
+
+    return resultados
+
+# Envolver los diccionarios en la versión perezosa: cada lista de patrones
+# se compila una sola vez, en el primer acceso, y los accesos siguientes
+# devuelven directamente los patrones compilados. Las claves se internan
+# para que las búsquedas repetidas por concepto se resuelvan comparando
+# punteros en vez de comparar las cadenas carácter por carácter, y las
+# listas de patrones se congelan como tuplas. El envoltorio mismo sigue
+# siendo mutable porque memoriza los patrones compilados.
+PATRONES_CONCEPTO = _PatronesPerezosos(
+    {sys.intern(clave): tuple(lista) for clave, lista in PATRONES_CONCEPTO.items()})
+PATRONES_PARAMETROS_ESPECIFICOS = _PatronesPerezosos(
+    {sys.intern(clave): tuple(lista) for clave, lista in PATRONES_PARAMETROS_ESPECIFICOS.items()})
+
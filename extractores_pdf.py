@@ -3,15 +3,16 @@ Módulo para conversión de archivos PDF a CSV.
 Contiene las funciones necesarias para extraer y estructurar datos de PDFs.
 """
 
+import io
 import os
 import re
 import csv
+import itertools
+import operator
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from pdfminer.high_level import extract_pages
 from pdfminer.layout import LAParams
-from pdfminer.pdfpage import PDFPage
-from pdfminer.pdfinterp import PDFResourceManager, PDFPageInterpreter
-from pdfminer.converter import PDFPageAggregator
-from pdfminer.pdfdocument import PDFDocument
-from pdfminer.pdfparser import PDFParser
 
 
 def convertir_pdf_a_csv(ruta_pdf, ruta_salida=None):
@@ -34,64 +35,119 @@ def convertir_pdf_a_csv(ruta_pdf, ruta_salida=None):
     # Extraer datos organizados por filas y columnas
     datos_estructurados = extraer_datos_estructurados(ruta_pdf)
     
+    # Acumular todas las filas y escribirlas de una sola vez: cada
+    # writerow es una transición Python->C separada y writerows llena
+    # mejor el búfer de salida
+    filas_csv = []
+    for pagina, filas in datos_estructurados.items():
+        # Encabezado de página y línea vacía para separar
+        filas_csv.append([f"PÁGINA {pagina}"])
+        filas_csv.append([])
+
+        # Filas de datos
+        filas_csv.extend(filas)
+
+        # Separador entre páginas
+        filas_csv.append([])
+        filas_csv.append([])
+
     # Guardar en archivo CSV
-    with open(ruta_salida, 'w', encoding='utf-8', newline='') as archivo_csv:
-        writer = csv.writer(archivo_csv)
-        
-        # Escribir datos
-        for pagina, filas in datos_estructurados.items():
-            # Escribir encabezado de página
-            writer.writerow([f"PÁGINA {pagina}"])
-            writer.writerow([])  # Línea vacía para separar
-            
-            # Escribir filas de datos
-            for fila in filas:
-                writer.writerow(fila)
-            
-            # Separador entre páginas
-            writer.writerow([])
-            writer.writerow([])
-    
+    with open(ruta_salida, 'w', encoding='utf-8', newline='',
+              buffering=1 << 20) as archivo_csv:
+        csv.writer(archivo_csv).writerows(filas_csv)
+
     return ruta_salida
 
 
-def procesar_texto(texto):
+def convertir_pdf_a_csv_batch(rutas_pdf, rutas_salida=None, workers=None):
     """
-    Procesa el texto para separar números y valores que podrían estar juntos.
-    
+    Convierte varios archivos PDF a CSV en paralelo.
+
+    La unidad de trabajo es el archivo completo: cada proceso parsea su
+    propio documento de principio a fin, así no se repite el análisis
+    estructural del PDF por página y un lote de facturas (de pocas
+    páginas cada una) reparte el trabajo entre todos los núcleos.
+
+    Args:
+        rutas_pdf (list): Rutas a los archivos PDF
+        rutas_salida (list, optional): Rutas de salida CSV, en el mismo
+                                       orden. Si es None, cada CSV se
+                                       guarda junto a su PDF.
+        workers (int, optional): Número de procesos a usar.
+                                 Si es None, se usa el número de CPUs.
+
+    Returns:
+        list: Rutas de los archivos CSV creados, en el mismo orden
+    """
+    if rutas_salida is None:
+        rutas_salida = [None] * len(rutas_pdf)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(convertir_pdf_a_csv, rutas_pdf, rutas_salida))
+
+
+# Patrones para separar valores pegados, compilados una sola vez a nivel
+# de módulo: procesar_texto se llama por cada elemento de texto del PDF
+_PATRONES_SEPARACION = (
+    # Patrón para separar números con comas seguidos de otros números
+    re.compile(r'(\d[\d,.]+)\s+(\d[\d,.]+)'),
+    # separa texto de números
+    re.compile(r'([a-zA-Z]+[a-zA-Z\s]+)(\d[\d,.]+)')
+)
+
+
+# Los elementos de texto se repiten mucho entre páginas y facturas
+# (encabezados, unidades, etiquetas de la tabla); cachear el resultado
+# evita repetir los splits de regex sobre cada duplicado
+@lru_cache(maxsize=8192)
+def _procesar_texto_cacheado(texto):
+    """
+    Separa números y valores que podrían estar juntos en el texto.
+
     Args:
         texto (str): Texto a procesar
-        
+
     Returns:
-        list: Lista de elementos separados
+        tuple: Elementos separados (tupla inmutable, apta para el caché)
     """
-    # Patrones para buscar en el texto
-    patrones = [
-        # Patrón para separar números con comas seguidos de otros números
-        r'(\d[\d,.]+)\s+(\d[\d,.]+)',
-        # separa texto de números
-        r'([a-zA-Z]+[a-zA-Z\s]+)(\d[\d,.]+)'
-    ]
-    
+    # Ambos patrones de separación exigen dígitos; la mayoría de los
+    # elementos de la factura son texto puro y se devuelven tal cual
+    # sin pasar por el motor de regex
+    if not any(c.isdigit() for c in texto):
+        limpio = texto.strip()
+        return (limpio,) if limpio else ()
+
     elementos = [texto]
-    
+
     # Aplicar cada patrón
-    for patron in patrones:
+    for patron in _PATRONES_SEPARACION:
+        # Fijar el método en una local evita la búsqueda de atributo
+        # en cada elemento del bucle interno
+        split = patron.split
         nuevos_elementos = []
         for elem in elementos:
-            # Verificar si el patrón coincide
-            coincidencia = re.search(patron, elem)
-            if coincidencia:
-                # Separar el elemento según el patrón
-                partes = re.split(patron, elem)
-                # Filtrar elementos vacíos y agregar a la lista
-                nuevos_elementos.extend([p.strip() for p in partes if p and p.strip()])
-            else:
-                nuevos_elementos.append(elem)
+            # split devuelve [elem] intacto cuando no hay coincidencia,
+            # así que no hace falta un search previo
+            partes = split(elem)
+            # Filtrar elementos vacíos y agregar a la lista
+            nuevos_elementos.extend([p.strip() for p in partes if p and p.strip()])
         elementos = nuevos_elementos
-    
+
     # Eliminar duplicados y elementos vacíos
-    return [e for e in elementos if e and e.strip()]
+    return tuple(e for e in elementos if e and e.strip())
+
+
+def procesar_texto(texto):
+    """
+    Procesa el texto para separar números y valores que podrían estar juntos.
+
+    Args:
+        texto (str): Texto a procesar
+
+    Returns:
+        list: Lista de elementos separados
+    """
+    return list(_procesar_texto_cacheado(texto))
 
 
 def extraer_datos_estructurados(ruta_pdf):
@@ -105,62 +161,61 @@ def extraer_datos_estructurados(ruta_pdf):
         dict: Diccionario con páginas como claves y listas de filas como valores
     """
     datos_por_pagina = {}
-    
+
+    # Leer el PDF completo a memoria una sola vez: pdfminer hace seeks
+    # constantes sobre el archivo y servirlos desde BytesIO evita pasar
+    # por el sistema de archivos en cada uno
     with open(ruta_pdf, 'rb') as f:
-        parser = PDFParser(f)
-        doc = PDFDocument(parser)
-        rsrcmgr = PDFResourceManager()
-        
-        device = PDFPageAggregator(rsrcmgr, laparams=LAParams(
-            line_margin=0.5,
-            word_margin=0.1,
-            boxes_flow=-1.0,  
-            detect_vertical=True
-        ))
-        
-        interpreter = PDFPageInterpreter(rsrcmgr, device)
-        
-        page_num = 0
-        for page in PDFPage.create_pages(doc):
-            page_num += 1
-            
-            interpreter.process_page(page)
-            layout = device.get_result()
-            
-            # Organizar elementos por posición Y para preservar filas
-            elementos_por_y = {}
-            
-            for element in layout:
-                if hasattr(element, 'get_text'):
-                    # Redondear para agrupar líneas cercanas (en grupos de 10 unidades)
-                    y = int(element.y0 / 10) * 10
-                    if y not in elementos_por_y:
-                        elementos_por_y[y] = []
-                    elementos_por_y[y].append(element)
-            
-            filas_pagina = []
-            
-            # Ordenar por y descendente (de arriba hacia abajo)
-            for y in sorted(elementos_por_y.keys(), reverse=True):
-                # Ordenar elementos de izquierda a derecha en cada fila
-                elementos = sorted(elementos_por_y[y], key=lambda e: e.x0)
-                
-                # Lista para almacenar todos los elementos procesados de la fila
-                elementos_procesados = []
-                
-                for element in elementos:
-                    texto = element.get_text().strip()
-                    if texto:
-                        # Procesar el texto para separar posibles números juntos
-                        sub_elementos = procesar_texto(texto)
-                        elementos_procesados.extend(sub_elementos)
-                
-                # Añadir fila si no está vacía
-                if elementos_procesados:
-                    filas_pagina.append(elementos_procesados)
-            
-            datos_por_pagina[page_num] = filas_pagina
-    
+        buffer = io.BytesIO(f.read())
+
+    # boxes_flow=None desactiva el análisis avanzado de cajas de texto
+    # de pdfminer (su paso más costoso); el agrupado por posición se
+    # hace abajo por filas. all_texts=False (explícito) evita que el
+    # texto dentro de figuras e imágenes entre al flujo de la página
+    laparams = LAParams(
+        line_margin=0.5,
+        word_margin=0.1,
+        boxes_flow=None,
+        detect_vertical=False,
+        all_texts=False
+    )
+
+    # extract_pages arma internamente el parser, el intérprete y el
+    # agregador, entrega los layouts de forma perezosa (sin retener
+    # todas las páginas) y con caching=True reutiliza fuentes e
+    # imágenes ya decodificadas dentro del documento
+    for page_num, layout in enumerate(
+            extract_pages(buffer, laparams=laparams, caching=True), 1):
+
+        # Extraer (fila, x, elemento) en una sola pasada y ordenar la
+        # lista completa una vez, en lugar de armar un diccionario de
+        # listas por posición Y y re-ordenar cada cubeta por separado.
+        # La fila se redondea en grupos de 10 unidades para agrupar
+        # líneas cercanas; el orden es de arriba hacia abajo y de
+        # izquierda a derecha
+        filas = [(int(element.y0 // 10), element.x0, element)
+                 for element in layout if hasattr(element, 'get_text')]
+        filas.sort(key=lambda t: (-t[0], t[1]))
+
+        filas_pagina = []
+
+        for y, grupo in itertools.groupby(filas, key=operator.itemgetter(0)):
+            # Lista para almacenar todos los elementos procesados de la fila
+            elementos_procesados = []
+
+            for _, _, element in grupo:
+                texto = element.get_text().strip()
+                if texto:
+                    # Procesar el texto para separar posibles números juntos
+                    # (extend acepta la tupla del caché sin copiarla a lista)
+                    elementos_procesados.extend(_procesar_texto_cacheado(texto))
+
+            # Añadir fila si no está vacía
+            if elementos_procesados:
+                filas_pagina.append(elementos_procesados)
+
+        datos_por_pagina[page_num] = filas_pagina
+
     return datos_por_pagina
 
 
@@ -19,15 +19,8 @@ import procesamiento
 import exportacion
 import utils
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("factura_processor.log"),
-        logging.StreamHandler()
-    ]
-)
+# Configuración de logging (una sola vez, en el punto de entrada)
+utils.configurar_logging()
 
 logger = logging.getLogger(__name__)
 
@@ -144,8 +137,11 @@ def procesar_directorio(ruta_directorio, ruta_salida=None, fecha_seleccionada=No
     directorio_csv = os.path.join(ruta_salida, "csv")
     utils.crear_directorio_si_no_existe(directorio_csv)
     
-    # Obtener lista de archivos PDF
-    archivos_pdf = [f for f in os.listdir(ruta_directorio) if f.lower().endswith('.pdf')]
+    # Obtener lista de archivos PDF (scandir evita el stat por entrada
+    # que haría listdir+isfile en directorios con miles de archivos)
+    with os.scandir(ruta_directorio) as entradas:
+        archivos_pdf = [e.name for e in entradas
+                        if e.is_file() and e.name.lower().endswith('.pdf')]
     
     if not archivos_pdf:
         logger.warning(f"No se encontraron archivos PDF en {ruta_directorio}")
@@ -8,6 +8,61 @@ import re
 import os
 from datetime import datetime
 
+# Tabla de traducción para eliminar comas y comillas de valores numéricos
+# en una sola pasada en C, en lugar de dos replace() encadenados
+_TABLA_NUMEROS = str.maketrans('', '', ',"')
+
+# Formato de fecha ISO (YYYY-MM-DD); validar con regex precompilado más
+# un chequeo de rango es mucho más barato que datetime.strptime
+_RE_FECHA_ISO = re.compile(r'^(\d{4})-(\d{2})-(\d{2})$')
+
+
+def _convertir_valor_numerico(texto):
+    """
+    Convierte una cadena numérica (ya sin comas ni comillas) a int o float.
+
+    float() maneja el signo directamente, así que no hace falta la
+    verificación manual de negativos; el resultado se reduce a int
+    cuando el texto no traía punto decimal.
+
+    Args:
+        texto (str): Cadena a convertir
+
+    Returns:
+        int, float o None: Valor numérico, o None si no es convertible
+    """
+    try:
+        numero = float(texto)
+    except ValueError:
+        return None
+
+    if numero.is_integer() and '.' not in texto:
+        return int(numero)
+    return numero
+
+
+def _limpiar_valor(value):
+    """
+    Limpia un valor numérico y lo convierte al formato apropiado.
+
+    Args:
+        value: Valor a limpiar y convertir
+
+    Returns:
+        int, float o str: Valor limpio y convertido
+    """
+    if value == "No encontrado":
+        return 0
+
+    if isinstance(value, str):
+        # Eliminar comas y comillas
+        texto = value.translate(_TABLA_NUMEROS)
+        numero = _convertir_valor_numerico(texto)
+        # Mantener como string si no se puede convertir
+        return texto if numero is None else numero
+
+    return value
+
 
 class FacturaProcessor:
     """
@@ -15,7 +70,12 @@ class FacturaProcessor:
     Esta clase realiza la limpieza, validación y transformación de los datos
     extraídos de las facturas.
     """
-    
+
+    # Sin __dict__ por instancia: en modo directorio se crea un
+    # procesador por factura y los slots ahorran esa sobrecarga
+    __slots__ = ('datos_generales', 'datos_componentes', '_fecha_procesamiento')
+
+
     def __init__(self, datos_generales, datos_componentes):
         """
         Inicializa el procesador de facturas con los datos extraídos.
@@ -26,11 +86,27 @@ class FacturaProcessor:
         """
         self.datos_generales = datos_generales
         self.datos_componentes = datos_componentes
-        self.fecha_procesamiento = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
+        self._fecha_procesamiento = None
+
         # Procesar datos
         self._limpiar_datos_generales()
         self._limpiar_datos_componentes()
+
+    @property
+    def fecha_procesamiento(self):
+        """
+        Marca de tiempo del procesamiento, calculada de forma perezosa.
+
+        Al crear un procesador por factura en modo directorio no tiene
+        sentido pagar datetime.now().strftime en cada __init__; se
+        calcula en el primer acceso y se memoriza.
+
+        Returns:
+            str: Fecha y hora en formato "YYYY-MM-DD HH:MM:SS"
+        """
+        if self._fecha_procesamiento is None:
+            self._fecha_procesamiento = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        return self._fecha_procesamiento
     
     def _limpiar_datos_generales(self):
         """
@@ -54,49 +130,19 @@ class FacturaProcessor:
         Limpia y transforma los datos de los componentes de la factura.
         Realiza conversiones de tipo y limpieza de formatos.
         """
-        for componente in self.datos_componentes:
-            for key, value in componente.items():
-                if key != "concepto" and value != "N/A":
-                    componente[key] = self._limpiar_valor(value)
-    
-    @staticmethod
-    def _limpiar_valor(value):
-        """
-        Limpia un valor numérico y lo convierte al formato apropiado.
-        
-        Args:
-            value: Valor a limpiar y convertir
-            
-        Returns:
-            int, float o str: Valor limpio y convertido
-        """
-        if value == "No encontrado":
-            return 0
-        
-        # Eliminar comas y comillas
-        if isinstance(value, str):
-            value = value.replace(',', '').replace('"', '')
-            
-            # Verificar si es un valor negativo
-            es_negativo = value.startswith('-')
-            if es_negativo:
-                value = value[1:]
-        
-            # Intentar convertir a float o int
-            try:
-                if '.' in value:
-                    value = float(value)
-                else:
-                    value = int(value)
-                
-                # Aplicar signo negativo si era negativo
-                if es_negativo:
-                    value = -value
-            except ValueError:
-                # Mantener como string si no se puede convertir
-                pass
-        
-        return value
+        # Construir los diccionarios nuevos en una sola pasada con
+        # comprensiones, usando la función de módulo directamente para
+        # no repetir la búsqueda del método por cada campo
+        self.datos_componentes = [
+            {key: (value if key == "concepto" or value == "N/A"
+                   else _limpiar_valor(value))
+             for key, value in componente.items()}
+            for componente in self.datos_componentes
+        ]
+
+    # Se mantiene como método estático por compatibilidad; la
+    # implementación vive a nivel de módulo
+    _limpiar_valor = staticmethod(_limpiar_valor)
     
     def calcular_totales(self):
         """
@@ -107,14 +153,16 @@ class FacturaProcessor:
         """
         totales = {}
         
-        # Subtotal de energía (suma de los totales de componentes, excepto energía reactiva)
-        subtotal_energia = 0
-        for componente in self.datos_componentes:
-            if componente["concepto"] != "Energía inductiva + capacitiva":
-                # Asegurar que el total sea un número
-                total_componente = self._asegurar_numero(componente.get("total", 0))
-                subtotal_energia += total_componente
-        
+        # Subtotal de energía (suma de los totales de componentes, excepto
+        # energía reactiva). Los totales ya son numéricos tras la limpieza
+        # del __init__, así que _asegurar_numero solo cubre el caso raro de
+        # un valor sin convertir y la agregación corre en el bucle C de sum
+        subtotal_energia = sum(
+            self._asegurar_numero(componente.get("total", 0))
+            for componente in self.datos_componentes
+            if componente["concepto"] != "Energía inductiva + capacitiva"
+        )
+
         totales["subtotal_energia_calculado"] = subtotal_energia
         
         # Verificar si el subtotal calculado coincide con el reportado
@@ -140,31 +188,12 @@ class FacturaProcessor:
         """
         if isinstance(valor, (int, float)):
             return valor
-        
+
         if isinstance(valor, str):
-            # Eliminar caracteres no numéricos excepto punto y signo negativo
-            valor_limpio = valor.replace(',', '').replace('"', '')
-            
-            # Verificar si es un valor negativo
-            es_negativo = valor_limpio.startswith('-')
-            if es_negativo:
-                valor_limpio = valor_limpio[1:]
-            
-            try:
-                if '.' in valor_limpio:
-                    resultado = float(valor_limpio)
-                else:
-                    resultado = int(valor_limpio)
-                
-                # Aplicar signo negativo si era negativo
-                if es_negativo:
-                    resultado = -resultado
-                
-                return resultado
-            except ValueError:
-                # Si no se puede convertir, devolver 0
-                return 0
-        
+            numero = _convertir_valor_numerico(valor.translate(_TABLA_NUMEROS))
+            # Si no se puede convertir, devolver 0
+            return 0 if numero is None else numero
+
         return 0
     
     def obtener_parametros_especificos(self):
@@ -188,10 +217,15 @@ class FacturaProcessor:
         
         return parametros
     
-    def validar_factura(self):
+    def validar_factura(self, totales=None):
         """
         Valida la consistencia de los datos de la factura.
-        
+
+        Args:
+            totales (dict, optional): Totales ya calculados con
+                                      calcular_totales. Si es None,
+                                      se calculan aquí.
+
         Returns:
             dict: Diccionario con resultados de validación
         """
@@ -214,17 +248,21 @@ class FacturaProcessor:
             validacion["es_valida"] = False
         
         # Validar totales
-        totales = self.calcular_totales()
+        if totales is None:
+            totales = self.calcular_totales()
         if abs(totales["diferencia_subtotal"]) > 1:  # Tolerancia de 1 peso por redondeo
             validacion["advertencias"].append(
                 f"Diferencia en subtotal de energía: {totales['diferencia_subtotal']} pesos"
             )
         
         # Validar fechas
-        if self.datos_generales["fecha_vencimiento"] != "No encontrado":
-            try:
-                datetime.strptime(self.datos_generales["fecha_vencimiento"], "%Y-%m-%d")
-            except ValueError:
+        fecha_vencimiento = self.datos_generales["fecha_vencimiento"]
+        if fecha_vencimiento != "No encontrado":
+            coincidencia = (_RE_FECHA_ISO.match(fecha_vencimiento)
+                            if isinstance(fecha_vencimiento, str) else None)
+            if (coincidencia is None
+                    or not 1 <= int(coincidencia.group(2)) <= 12
+                    or not 1 <= int(coincidencia.group(3)) <= 31):
                 validacion["errores"].append("Formato de fecha de vencimiento inválido")
                 validacion["es_valida"] = False
         
@@ -237,12 +275,16 @@ class FacturaProcessor:
         Returns:
             dict: Datos completos de la factura procesados
         """
+        # Calcular los totales una sola vez y reutilizarlos en la
+        # validación, en lugar de recorrer los componentes dos veces
+        totales = self.calcular_totales()
+
         resultado = {
             "datos_generales": self.datos_generales,
             "componentes": self.datos_componentes,
-            "totales_calculados": self.calcular_totales(),
+            "totales_calculados": totales,
             "parametros_especificos": self.obtener_parametros_especificos(),
-            "validacion": self.validar_factura(),
+            "validacion": self.validar_factura(totales),
             "fecha_procesamiento": self.fecha_procesamiento
         }
         
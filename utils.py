@@ -5,21 +5,108 @@ Contiene funciones comunes utilizadas por otros módulos.
 
 import os
 import re
+import sys
+import atexit
+import codecs
 import logging
+import logging.handlers
+import calendar
 from datetime import datetime
+from functools import lru_cache
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("factura_processor.log"),
-        logging.StreamHandler()
-    ]
-    
+logger = logging.getLogger(__name__)
+
+
+def configurar_logging(ruta_log="factura_processor.log", nivel=logging.INFO):
+    """
+    Configura el logging de la aplicación de forma explícita.
+
+    Antes el módulo llamaba a logging.basicConfig al importarse, lo que
+    abría el archivo de log y mutaba el logger raíz como efecto
+    secundario de cualquier import; ahora el punto de entrada lo invoca
+    una sola vez. Si el logger raíz ya tiene handlers, no hace nada.
+
+    Args:
+        ruta_log (str): Ruta del archivo de log
+        nivel (int): Nivel mínimo de logging
+    """
+    raiz = logging.getLogger()
+    if raiz.handlers:
+        return
+
+    formato = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    manejador_archivo = logging.FileHandler(ruta_log, delay=True)
+    manejador_archivo.setFormatter(formato)
+
+    # Los registros INFO se acumulan en memoria y se escriben al archivo
+    # en tandas (un write por lote en vez de uno por registro); WARNING
+    # o superior vacía el búfer de inmediato para no perder contexto
+    # ante errores, y el atexit asegura el vaciado final
+    manejador_memoria = logging.handlers.MemoryHandler(
+        capacity=1024,
+        flushLevel=logging.WARNING,
+        target=manejador_archivo
+    )
+    atexit.register(manejador_memoria.close)
+
+    raiz.setLevel(nivel)
+    raiz.addHandler(manejador_memoria)
+
+    # En corridas no interactivas (salida redirigida o aplicación
+    # congelada sin consola) el handler de consola solo suma un write
+    # por registro; se agrega únicamente con una terminal real o si se
+    # pide por la variable de entorno
+    if ((sys.stderr is not None and sys.stderr.isatty())
+            or os.environ.get('FACTURAS_LOG_CONSOLA')):
+        manejador_consola = logging.StreamHandler()
+        manejador_consola.setFormatter(formato)
+        raiz.addHandler(manejador_consola)
+
+# Patrones que deben estar presentes en una factura válida
+_PATRONES_OBLIGATORIOS = {
+    'fecha': r'Fecha\s+vencimiento',
+    'periodo': r'Período\s+Facturación',
+    'subtotal': r'Subtotal\s+(?:base\s+)?energía'
+}
+
+# Alternación con grupos nombrados para buscar los tres patrones en una
+# sola pasada sobre el contenido, en vez de tres recorridos completos
+_PATRON_OBLIGATORIOS_UNION = re.compile(
+    '|'.join('(?P<%s>%s)' % item for item in _PATRONES_OBLIGATORIOS.items())
 )
 
-logger = logging.getLogger(__name__)
+# Tamaño de bloque para el recorrido por partes del CSV y solape que se
+# conserva entre bloques para no partir una coincidencia en la frontera
+_TAMANO_BLOQUE = 64 * 1024
+_SOLAPE_BLOQUE = 64
+
+# Prefiltro literal por bloque: la primera palabra de cada patrón
+# obligatorio. La búsqueda de subcadenas corre en el memmem de C, mucho
+# más barata que el motor de regex sobre bloques que no contienen
+# ninguna de las palabras
+_PREFILTROS_OBLIGATORIOS = ('Fecha', 'Período', 'Subtotal')
+
+# Tabla de traducción que elimina comas, espacios y comillas de un valor
+# numérico en una sola pasada en C
+_TABLA_NUMEROS = str.maketrans('', '', ', "')
+
+# Forma de una cadena numérica simple (signo opcional, parte entera y/o
+# decimal); comprobarla antes de llamar a int/float evita usar
+# excepciones como control de flujo en las celdas no numéricas
+_RE_NUMERICO = re.compile(r'-?(?:\d+\.?\d*|\.\d+)')
+
+# Tabla que intercambia los separadores de miles y decimales (formato
+# en inglés -> formato de moneda local)
+_TABLA_SEPARADORES = str.maketrans(',.', '.,')
+
+# Formas de fecha comunes combinadas en una sola alternación: un único
+# recorrido del texto y el grupo nombrado que capturó decide el formato
+_RE_FECHA_UNION = re.compile(
+    r'(?P<iso>(\d{4})-(\d{1,2})-(\d{1,2}))'        # YYYY-MM-DD
+    r'|(?P<barras>(\d{1,2})/(\d{1,2})/(\d{4}))'    # DD/MM/YYYY o MM/DD/YYYY
+    r'|(?P<guiones>(\d{1,2})-(\d{1,2})-(\d{4}))'   # DD-MM-YYYY o MM-DD-YYYY
+)
 
 
 def crear_directorio_si_no_existe(directorio):
@@ -32,15 +119,41 @@ def crear_directorio_si_no_existe(directorio):
     Returns:
         bool: True si el directorio existe o fue creado, False en caso de error
     """
-    if not os.path.exists(directorio):
-        try:
-            os.makedirs(directorio)
-            logger.info(f"Directorio creado: {directorio}")
-            return True
-        except Exception as e:
-            logger.error(f"Error al crear directorio {directorio}: {e}")
-            return False
-    return True
+    # makedirs con exist_ok=True resuelve existencia y creación en una
+    # sola llamada, sin el stat previo de os.path.exists
+    try:
+        os.makedirs(directorio, exist_ok=True)
+        return True
+    except OSError as e:
+        # Formato diferido: el mensaje solo se construye si el nivel
+        # está habilitado
+        logger.error("Error al crear directorio %s: %s", directorio, e)
+        return False
+
+
+def crear_directorios(directorios):
+    """
+    Crea varios directorios de una vez, omitiendo prefijos redundantes.
+
+    makedirs crea los padres que falten, así que un directorio que es
+    prefijo de otro de la misma tanda no necesita su propia llamada.
+
+    Args:
+        directorios (iterable): Rutas de los directorios a crear
+
+    Returns:
+        bool: True si todos los directorios existen o fueron creados
+    """
+    resultado = True
+    unicos = {os.path.abspath(directorio) for directorio in directorios}
+
+    for directorio in sorted(unicos):
+        if any(otro != directorio and otro.startswith(directorio + os.sep)
+               for otro in unicos):
+            continue
+        resultado = crear_directorio_si_no_existe(directorio) and resultado
+
+    return resultado
 
 
 def obtener_nombre_archivo_sin_extension(ruta_archivo):
@@ -53,7 +166,13 @@ def obtener_nombre_archivo_sin_extension(ruta_archivo):
     Returns:
         str: Nombre del archivo sin extensión
     """
-    return os.path.splitext(os.path.basename(ruta_archivo))[0]
+    # Cortar con rfind en vez de basename+splitext: dos rebanadas sin
+    # tuplas intermedias ni llamadas a os.path
+    base = ruta_archivo[ruta_archivo.rfind('/') + 1:]
+    base = base[base.rfind('\\') + 1:]
+    punto = base.rfind('.')
+    # punto <= 0 conserva los archivos ocultos (p. ej. ".config")
+    return base if punto <= 0 else base[:punto]
 
 
 def validar_estructura_csv(ruta_csv):
@@ -67,65 +186,144 @@ def validar_estructura_csv(ruta_csv):
         bool: True si la estructura es válida, False en caso contrario
     """
     try:
-        with open(ruta_csv, 'r', encoding='utf-8') as file:
-            contenido = file.read()
-    except UnicodeDecodeError:
-        try:
-            with open(ruta_csv, 'r', encoding='latin-1') as file:
-                contenido = file.read()
-        except Exception as e:
-            logger.error(f"Error al leer archivo {ruta_csv}: {e}")
-            return False
-    
-    # Patrones que deben estar presentes en una factura válida
-    patrones_obligatorios = [
-        r'Fecha\s+vencimiento',
-        r'Período\s+Facturación',
-        r'Subtotal\s+(?:base\s+)?energía'
-    ]
-    
-    for patron in patrones_obligatorios:
-        if not re.search(patron, contenido):
-            logger.warning(f"Patrón no encontrado en {ruta_csv}: {patron}")
-            return False
-    
-    return True
+        stat = os.stat(ruta_csv)
+        return _validar_estructura_cacheado(ruta_csv, stat.st_mtime_ns, stat.st_size)
+    except Exception as e:
+        logger.error("Error al leer archivo %s: %s", ruta_csv, e)
+        return False
 
 
+@lru_cache(maxsize=4096)
+def _validar_estructura_cacheado(ruta_csv, mtime_ns, tamano):
+    """
+    Escanea y valida el CSV, memorizando el resultado por archivo.
+
+    La clave incluye mtime y tamaño: si el archivo cambia, la entrada
+    vieja del caché deja de coincidir y se vuelve a escanear. Las
+    validaciones repetidas del mismo CSV en un lote se resuelven sin
+    releer el archivo.
+
+    Args:
+        ruta_csv (str): Ruta del archivo CSV
+        mtime_ns (int): Fecha de modificación del archivo en nanosegundos
+        tamano (int): Tamaño del archivo en bytes
+
+    Returns:
+        bool: True si la estructura es válida, False en caso contrario
+    """
+    pendientes = _escanear_patrones_obligatorios(ruta_csv)
+
+    for clave in pendientes:
+        logger.warning("Patrón no encontrado en %s: %s",
+                       ruta_csv, _PATRONES_OBLIGATORIOS[clave])
+
+    return not pendientes
+
+
+def _escanear_patrones_obligatorios(ruta_csv):
+    """
+    Recorre el CSV por bloques buscando los patrones obligatorios.
+
+    Leer por bloques mantiene la memoria acotada en archivos grandes y
+    permite cortar el recorrido en cuanto aparecen los tres patrones
+    (en una factura válida suelen estar en los primeros KB); el solape
+    entre bloques evita perder coincidencias partidas en la frontera.
+
+    Se decodifica en UTF-8 y, ante bytes inválidos, se cambia a latin-1
+    desde ese punto sin releer el archivo (los bloques anteriores ya
+    decodificaron bien y quedaron escaneados); decodificar todo con
+    errors='replace' no sirve porque rompería las letras acentuadas de
+    los propios patrones.
+
+    Args:
+        ruta_csv (str): Ruta del archivo CSV
+
+    Returns:
+        set: Claves de _PATRONES_OBLIGATORIOS que no aparecieron
+    """
+    pendientes = set(_PATRONES_OBLIGATORIOS)
+    decodificador = codecs.getincrementaldecoder('utf-8')()
+    cola = ''
+
+    with open(ruta_csv, 'rb') as file:
+        while pendientes:
+            bloque = file.read(_TAMANO_BLOQUE)
+            try:
+                texto = cola + decodificador.decode(bloque, final=not bloque)
+            except UnicodeDecodeError:
+                # Recuperar los bytes aún no decodificados y seguir en
+                # latin-1, que acepta cualquier byte
+                restante = decodificador.getstate()[0] + bloque
+                decodificador = codecs.getincrementaldecoder('latin-1')()
+                texto = cola + decodificador.decode(restante, final=not bloque)
+
+            if any(palabra in texto for palabra in _PREFILTROS_OBLIGATORIOS):
+                for match in _PATRON_OBLIGATORIOS_UNION.finditer(texto):
+                    pendientes.discard(match.lastgroup)
+
+            if not bloque:
+                break
+            cola = texto[-_SOLAPE_BLOQUE:]
+
+    return pendientes
+
+
+# Las columnas de fecha repiten los mismos valores en muchas filas
+# (p. ej. el período de facturación); la función es pura, así que el
+# caché convierte los duplicados en un lookup
+@lru_cache(maxsize=8192)
 def normalizar_fecha(fecha_str):
     """
     Normaliza una fecha a formato ISO (YYYY-MM-DD).
-    
+
     Args:
         fecha_str (str): Fecha en varios formatos posibles
         
     Returns:
         str: Fecha en formato ISO o la cadena original si no se puede normalizar
     """
-    # Patrones de fecha comunes
-    patrones = [
-        r'(\d{4})-(\d{1,2})-(\d{1,2})',  # YYYY-MM-DD
-        r'(\d{1,2})/(\d{1,2})/(\d{4})',  # DD/MM/YYYY o MM/DD/YYYY
-        r'(\d{1,2})-(\d{1,2})-(\d{4})'   # DD-MM-YYYY o MM-DD-YYYY
-    ]
-    
-    for patron in patrones:
-        match = re.search(patron, fecha_str)
-        if match:
-            # Determinar el formato
-            if '/' in fecha_str and len(match.group(3)) == 4:
-                # Asumir DD/MM/YYYY
-                dia, mes, anio = match.group(1), match.group(2), match.group(3)
-                try:
-                    # Validar que la fecha sea correcta
-                    fecha = datetime(int(anio), int(mes), int(dia))
-                    return fecha.strftime('%Y-%m-%d')
-                except ValueError:
-                    pass
-            elif '-' in fecha_str and len(match.group(1)) == 4:
-                # Ya está en formato YYYY-MM-DD
-                return fecha_str
-    
+    # Camino rápido para el caso más común: la fecha ya viene en ISO
+    # (YYYY-MM-DD) y se devuelve tal cual con tres comparaciones de
+    # caracteres, sin tocar el motor de regex
+    if (len(fecha_str) == 10 and fecha_str[4] == '-' and fecha_str[7] == '-'
+            and fecha_str[:4].isdigit()):
+        return fecha_str
+
+    # Camino rápido para DD/MM/YYYY (y D/M/YYYY): despachar por las
+    # barras y convertir las rebanadas con int, sin motor de regex;
+    # las entradas exóticas siguen cayendo al bucle de patrones
+    if 8 <= len(fecha_str) <= 10 and fecha_str.count('/') == 2:
+        dia_txt, mes_txt, anio_txt = fecha_str.split('/')
+        if (dia_txt.isdigit() and mes_txt.isdigit()
+                and len(anio_txt) == 4 and anio_txt.isdigit()):
+            dia, mes, anio = int(dia_txt), int(mes_txt), int(anio_txt)
+            if (anio >= 1 and 1 <= mes <= 12
+                    and 1 <= dia <= calendar.monthrange(anio, mes)[1]):
+                return f"{anio:04d}-{mes:02d}-{dia:02d}"
+            # Fecha con barras pero fuera de rango: se conserva tal cual,
+            # igual que en el camino con regex
+            return fecha_str
+
+    for match in _RE_FECHA_UNION.finditer(fecha_str):
+        grupo = match.lastgroup
+
+        if grupo == 'iso':
+            # Ya está en formato YYYY-MM-DD
+            return fecha_str
+
+        if grupo == 'barras':
+            # Asumir DD/MM/YYYY
+            dia, mes, anio = int(match.group(6)), int(match.group(7)), int(match.group(8))
+            # Validar el rango sin construir un datetime; monthrange
+            # ya cubre los años bisiestos, y el f-string evita el
+            # costo de strftime
+            if (anio >= 1 and 1 <= mes <= 12
+                    and 1 <= dia <= calendar.monthrange(anio, mes)[1]):
+                return f"{anio:04d}-{mes:02d}-{dia:02d}"
+
+        # Las fechas con guiones tipo DD-MM-YYYY se conservan tal cual
+        # (mismo comportamiento que el bucle de patrones anterior)
+
     # Si no se pudo normalizar, devolver la cadena original
     return fecha_str
 
@@ -140,63 +338,160 @@ def convertir_a_numero(valor):
     Returns:
         int, float o el valor original: Valor convertido o el original si no se puede convertir
     """
-    if valor is None:
-        return 0
-    
-    if isinstance(valor, (int, float)):
+    # Camino rápido: números ya convertidos (type evita el recorrido de
+    # la jerarquía que hace isinstance) y valores vacíos
+    tipo = type(valor)
+    if tipo is int or tipo is float:
         return valor
-    
+
+    if valor is None or valor == '':
+        return 0
+
     if isinstance(valor, str):
-        # Limpiar el valor (quitar comas, espacios, etc.)
-        valor_limpio = valor.replace(',', '').replace(' ', '').replace('"', '')
-        
-        # Determinar si es negativo
-        es_negativo = valor_limpio.startswith('-')
-        if es_negativo:
-            valor_limpio = valor_limpio[1:]
-        
-        try:
-            # Intentar convertir a entero o flotante
-            if '.' in valor_limpio:
-                resultado = float(valor_limpio)
-            else:
-                resultado = int(valor_limpio)
-            
-            # Aplicar signo negativo si corresponde
-            if es_negativo:
-                resultado = -resultado
-                
-            return resultado
-        except ValueError:
-            pass
-    
+        return _convertir_cadena_a_numero(valor)
+
+    # Si no se pudo convertir, devolver el valor original
+    return valor
+
+
+# Las celdas de texto se repiten mucho entre facturas (tarifas,
+# cantidades estándar); memorizar el parseo de cadenas elimina el costo
+# de limpieza y conversión para los duplicados
+@lru_cache(maxsize=8192)
+def _convertir_cadena_a_numero(valor):
+    """
+    Convierte una cadena a número, memorizando los valores repetidos.
+
+    Args:
+        valor (str): Cadena a convertir
+
+    Returns:
+        int, float o str: Valor convertido o la cadena original
+    """
+    # Intentar la conversión directa antes de limpiar: la mayoría
+    # de las celdas numéricas no traen comas ni comillas. El chequeo
+    # con regex evita levantar y atrapar excepciones por cada celda de
+    # texto; int/float ya no pueden fallar y manejan el signo solos
+    if _RE_NUMERICO.fullmatch(valor):
+        return float(valor) if '.' in valor else int(valor)
+
+    # Limpiar el valor (quitar comas, espacios y comillas) en una
+    # sola pasada, sin los tres replace encadenados
+    valor_limpio = valor.translate(_TABLA_NUMEROS)
+    if _RE_NUMERICO.fullmatch(valor_limpio):
+        return float(valor_limpio) if '.' in valor_limpio else int(valor_limpio)
+
     # Si no se pudo convertir, devolver el valor original
     return valor
 
 
+def _crear_formateador_monetario(incluir_signo):
+    """
+    Fabrica un formateador monetario especializado por signo.
+
+    Cada cierre queda con el prefijo y la tabla de separadores ya
+    resueltos, sin la rama sobre incluir_signo ni búsquedas de nombres
+    de módulo en cada llamada.
+
+    Args:
+        incluir_signo (bool): Si el formateador antepone el signo de pesos
+
+    Returns:
+        function: Formateador especializado de valores monetarios
+    """
+    prefijo = '$' if incluir_signo else ''
+    convertir = convertir_a_numero
+    formatear = _formatear_numero_monetario
+
+    def formateador(valor):
+        # Convertir a número si es posible
+        numero = convertir(valor)
+
+        # Si no es un número, devolver el valor original
+        if not isinstance(numero, (int, float)):
+            return str(valor)
+
+        return formatear(numero, prefijo)
+
+    return formateador
+
+
+# El caché se aplica tras la conversión numérica (el valor crudo puede
+# no ser hashable); los montos repetidos entre facturas se formatean
+# una sola vez
+@lru_cache(maxsize=8192)
+def _formatear_numero_monetario(numero, prefijo):
+    """
+    Formatea un número como moneda, memorizando los montos repetidos.
+
+    Args:
+        numero (int o float): Valor ya convertido
+        prefijo (str): Prefijo a anteponer ('$' o cadena vacía)
+
+    Returns:
+        str: Valor con separador de miles y 2 decimales
+    """
+    # Formatear con separador de miles y 2 decimales; el intercambio
+    # de separadores es una sola pasada de translate
+    return prefijo + format(numero, ',.2f').translate(_TABLA_SEPARADORES)
+
+
+# Formateadores especializados para puntos de llamada que fijan el signo
+formatear_valor_monetario_con_signo = _crear_formateador_monetario(True)
+formatear_valor_monetario_sin_signo = _crear_formateador_monetario(False)
+
+
 def formatear_valor_monetario(valor, incluir_signo=True):
     """
     Formatea un valor como valor monetario.
-    
+
     Args:
         valor: Valor a formatear
         incluir_signo (bool): Si se debe incluir el signo de pesos
-        
+
     Returns:
         str: Valor formateado como moneda
     """
-    # Convertir a número si es posible
-    valor_numerico = convertir_a_numero(valor)
-    
-    # Si no es un número, devolver el valor original
-    if not isinstance(valor_numerico, (int, float)):
-        return str(valor)
-    
-    # Formatear con separador de miles y 2 decimales
-    valor_formateado = f"{valor_numerico:,.2f}".replace(',', '#').replace('.', ',').replace('#', '.')
-    
-    # Agregar signo de pesos si se solicita
     if incluir_signo:
-        return f"${valor_formateado}"
-    
-    return valor_formateado
\ No newline at end of file
+        return formatear_valor_monetario_con_signo(valor)
+    return formatear_valor_monetario_sin_signo(valor)
+
+
+def convertir_a_numero_series(serie):
+    """
+    Convierte una columna completa de pandas a valores numéricos.
+
+    La limpieza y la conversión corren en los kernels en C de pandas en
+    vez de llamar convertir_a_numero celda por celda; los valores no
+    convertibles quedan en 0.
+
+    Args:
+        serie (pandas.Series): Columna con valores a convertir
+
+    Returns:
+        pandas.Series: Columna numérica
+    """
+    import pandas as pd
+
+    limpia = serie.astype(str).str.translate(_TABLA_NUMEROS)
+    return pd.to_numeric(limpia, errors='coerce').fillna(0)
+
+
+def formatear_valor_monetario_series(serie, incluir_signo=True):
+    """
+    Formatea una columna completa de pandas como valores monetarios.
+
+    Args:
+        serie (pandas.Series): Columna con valores a formatear
+        incluir_signo (bool): Si se debe incluir el signo de pesos
+
+    Returns:
+        pandas.Series: Columna de cadenas con formato de moneda
+    """
+    numeros = convertir_a_numero_series(serie)
+    formateada = numeros.map('{:,.2f}'.format).str.translate(_TABLA_SEPARADORES)
+
+    if incluir_signo:
+        return '$' + formateada
+
+    return formateada
\ No newline at end of file